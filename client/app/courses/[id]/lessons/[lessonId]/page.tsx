@@ -11,14 +11,11 @@ export default async function LessonPage({ params }: { params: { id: string, les
     const courseId = parseInt(params.id);
     const lessonId = parseInt(params.lessonId);
 
-    const course = await courseService.getById(courseId);
-    const lesson = course.modules
-        .flatMap(m => m.lessons)
-        .find(l => l.id === lessonId);
-
-    if (!lesson) {
+    const context = await courseService.getLessonContext(lessonId).catch(() => null);
+    if (!context || context.course_id !== courseId) {
         return <div>Lesson not found</div>;
     }
+    const { lesson, previous, next } = context;
 
     // Fetch student progress for this lesson
     let progress = { video_progress: 0 };
@@ -36,7 +33,7 @@ export default async function LessonPage({ params }: { params: { id: string, les
                         <Link href="/dashboard" className="hover:text-primary transition-colors">Dashboard</Link>
                         <span>/</span>
                         <Link href={`/courses/${courseId}`} className="hover:text-primary transition-colors line-clamp-1 max-w-[200px]">
-                            {course.title}
+                            {context.course_title}
                         </Link>
                         <span>/</span>
                         <span className="text-foreground font-medium line-clamp-1">{lesson.title}</span>
@@ -71,13 +68,27 @@ export default async function LessonPage({ params }: { params: { id: string, les
                     </div>
 
                     <div className="flex justify-between items-center mt-20 pt-10 border-t border-border">
-                        {/* Pagination buttons - can be enhanced later to link real lessons */}
-                        <button className="flex items-center gap-3 px-6 py-3 bg-secondary text-secondary-foreground font-bold rounded-xl hover:bg-secondary/80 transition-all active:scale-95 border border-border">
-                            <ChevronLeft className="h-5 w-5" /> Previous
-                        </button>
-                        <button className="flex items-center gap-3 px-6 py-3 bg-primary text-primary-foreground font-bold rounded-xl hover:opacity-90 transition-all active:scale-95 shadow-lg shadow-primary/20">
-                            Next <ChevronRight className="h-5 w-5" />
-                        </button>
+                        {previous ? (
+                            <Link
+                                href={`/courses/${courseId}/lessons/${previous.id}`}
+                                title={previous.title}
+                                className="flex items-center gap-3 px-6 py-3 bg-secondary text-secondary-foreground font-bold rounded-xl hover:bg-secondary/80 transition-all active:scale-95 border border-border"
+                            >
+                                <ChevronLeft className="h-5 w-5" /> Previous
+                            </Link>
+                        ) : <span />}
+                        <span className="text-sm text-muted-foreground">
+                            {context.position} / {context.total_lessons}
+                        </span>
+                        {next ? (
+                            <Link
+                                href={`/courses/${courseId}/lessons/${next.id}`}
+                                title={next.title}
+                                className="flex items-center gap-3 px-6 py-3 bg-primary text-primary-foreground font-bold rounded-xl hover:opacity-90 transition-all active:scale-95 shadow-lg shadow-primary/20"
+                            >
+                                Next <ChevronRight className="h-5 w-5" />
+                            </Link>
+                        ) : <span />}
                     </div>
                 </div>
             </div>
@@ -8,6 +8,31 @@ export interface Lesson {
     order: number;
 }
 
+export interface LessonDetail extends Lesson {
+    module_id: number;
+    created_at: string;
+}
+
+export interface LessonRef {
+    id: number;
+    title: string;
+    module_id: number;
+}
+
+export interface LessonContext {
+    course_id: number;
+    course_title: string;
+    course_version: number;
+    lesson: LessonDetail;
+    module: { id: number; title: string; order: number };
+    position: number;
+    total_lessons: number;
+    module_position: number;
+    module_lesson_count: number;
+    previous: LessonRef | null;
+    next: LessonRef | null;
+}
+
 export interface Module {
     id: number;
     title: string;
@@ -45,6 +70,14 @@ export const courseService = {
     getById: (id: number) =>
         fetchClient<Course>(`/courses/${id}`),
 
+    // Course responses are outlines; lesson content is fetched per lesson
+    getLesson: (lessonId: number) =>
+        fetchClient<LessonDetail>(`/courses/lessons/${lessonId}`),
+
+    // Lesson plus its neighbours, without loading the whole course
+    getLessonContext: (lessonId: number) =>
+        fetchClient<LessonContext>(`/lessons/${lessonId}/context`),
+
     create: (data: CourseCreate) =>
         fetchClient<Course>("/courses/", {
             method: "POST",
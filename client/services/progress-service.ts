@@ -5,7 +5,14 @@ export interface UserProgress {
     lesson_id: number;
     is_completed: boolean;
     video_progress: number;
-    last_accessed: string;
+    last_accessed: string | null;
+}
+
+// 202 Accepted for a buffered video position: completion state is not included
+export interface UserProgressHeartbeat {
+    user_id: string;
+    lesson_id: number;
+    video_progress: number;
 }
 
 export interface UserProgressUpdate {
@@ -17,8 +24,11 @@ export const progressService = {
     get: (lessonId: number) =>
         fetchClient<UserProgress>(`/progress/${lessonId}`),
 
+    getCourse: (courseId: number) =>
+        fetchClient<UserProgress[]>(`/progress/course/${courseId}`),
+
     update: (lessonId: number, data: UserProgressUpdate) =>
-        fetchClient<UserProgress>(`/progress/${lessonId}`, {
+        fetchClient<UserProgress | UserProgressHeartbeat>(`/progress/${lessonId}`, {
             method: "POST",
             body: JSON.stringify(data),
         }),
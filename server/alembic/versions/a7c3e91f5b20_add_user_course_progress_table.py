@@ -0,0 +1,44 @@
+"""Add user_course_progress table
+
+Revision ID: a7c3e91f5b20
+Revises: 313de4a600f8
+Create Date: 2026-10-17 21:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e91f5b20'
+down_revision: Union[str, Sequence[str], None] = '313de4a600f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_course_progress',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('completed_count', sa.Integer(), nullable=False),
+    sa.Column('total_lessons', sa.Integer(), nullable=False),
+    sa.Column('last_activity', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'course_id', name='_user_course_progress_uc')
+    )
+    op.create_index(op.f('ix_user_course_progress_course_id'), 'user_course_progress', ['course_id'], unique=False)
+    op.create_index(op.f('ix_user_course_progress_id'), 'user_course_progress', ['id'], unique=False)
+    # Existing data: populate with `python scripts/rebuild_course_progress.py`
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_course_progress_id'), table_name='user_course_progress')
+    op.drop_index(op.f('ix_user_course_progress_course_id'), table_name='user_course_progress')
+    op.drop_table('user_course_progress')
@@ -0,0 +1,36 @@
+"""Add catalog keyset and course tree indexes
+
+Revision ID: c41d8e2a9f63
+Revises: a7c3e91f5b20
+Create Date: 2026-10-17 21:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d8e2a9f63'
+down_revision: Union[str, Sequence[str], None] = 'a7c3e91f5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_courses_created_at_id', 'courses', ['created_at', 'id'], unique=False)
+    op.create_index('ix_courses_published_created_at_id', 'courses', ['is_published', 'created_at', 'id'], unique=False)
+    op.create_index('ix_courses_instructor_created_at_id', 'courses', ['instructor_id', 'created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_modules_course_id'), 'modules', ['course_id'], unique=False)
+    op.create_index(op.f('ix_lessons_module_id'), 'lessons', ['module_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_lessons_module_id'), table_name='lessons')
+    op.drop_index(op.f('ix_modules_course_id'), table_name='modules')
+    op.drop_index('ix_courses_instructor_created_at_id', table_name='courses')
+    op.drop_index('ix_courses_published_created_at_id', table_name='courses')
+    op.drop_index('ix_courses_created_at_id', table_name='courses')
@@ -0,0 +1,54 @@
+"""Add full-text search vectors to courses and lessons
+
+Revision ID: e9a14c6b3d72
+Revises: d5b27f0e8c14
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9a14c6b3d72'
+down_revision: Union[str, Sequence[str], None] = 'd5b27f0e8c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Generated columns are maintained by PostgreSQL on every write; titles weigh more than bodies.
+    # SQLite databases use an FTS5 table created at startup instead (app/services/search).
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(
+        """
+        ALTER TABLE courses ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE lessons ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(content, '')), 'B')
+        ) STORED
+        """
+    )
+    op.create_index('ix_courses_search_vector', 'courses', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_lessons_search_vector', 'lessons', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_lessons_search_vector', table_name='lessons')
+    op.drop_index('ix_courses_search_vector', table_name='courses')
+    op.drop_column('lessons', 'search_vector')
+    op.drop_column('courses', 'search_vector')
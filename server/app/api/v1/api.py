@@ -1,17 +1,40 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from app.api.v1.endpoints import users
+from app.core import security
+from app.db.instrumentation import get_route_stats
+from app.services.ai.response_cache import response_cache
+from app.services.ai.semantic_cache import semantic_cache
+from app.services.ai.singleflight import ai_singleflight
+from app.services.course_cache import course_cache
+from app.services.progress_buffer import progress_buffer
 
 api_router = APIRouter()
 
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 from app.api.v1.endpoints import courses
 api_router.include_router(courses.router, prefix="/courses", tags=["courses"])
+from app.api.v1.endpoints import lessons
+api_router.include_router(lessons.router, prefix="/lessons", tags=["lessons"])
 from app.api.v1.endpoints import media, progress, enrollments, ai
 api_router.include_router(media.router, prefix="/media", tags=["media"])
 api_router.include_router(progress.router, prefix="/progress", tags=["progress"])
 api_router.include_router(enrollments.router, prefix="/enrollments", tags=["enrollments"])
 api_router.include_router(ai.router, prefix="/ai", tags=["ai"])
+from app.api.v1.endpoints import search
+api_router.include_router(search.router, prefix="/search", tags=["search"])
 
 @api_router.get("/health")
 def health_check():
     return {"status": "ok", "message": "Server is running"}
+
+@api_router.get("/metrics", dependencies=[Depends(security.get_current_superuser)])
+def metrics():
+    return {
+        "auth_token_cache": security.get_token_cache_stats(),
+        "sql": get_route_stats(),
+        "course_cache": course_cache.stats(),
+        "progress_buffer": progress_buffer.stats(),
+        "ai_response_cache": response_cache.stats(),
+        "ai_semantic_cache": semantic_cache.stats(),
+        "ai_singleflight": ai_singleflight.stats(),
+    }
@@ -4,7 +4,8 @@ from typing import Any
 from app import schemas
 from app.core import security
 from app.db import session as deps
-from app.services.ai.agents import AITutorService, QuizGeneratorService, CodeAssistantService
+from app.services.ai.agents import AITutorService, QuizGeneratorService, CodeAssistantService, CourseGeneratorService
+from app.services.ai.registry import ProviderRegistry, get_ai_registry
 
 router = APIRouter()
 
@@ -14,11 +15,12 @@ async def tutor_chat(
     db: AsyncSession = Depends(deps.get_db),
     chat_in: schemas.ChatRequest,
     current_user_token: dict = Depends(security.get_current_user),
+    registry: ProviderRegistry = Depends(get_ai_registry),
 ) -> Any:
     """
     Chat with the AI Tutor.
     """
-    tutor = AITutorService(db)
+    tutor = AITutorService(db, registry=registry)
     response = await tutor.chat(
         user_id=current_user_token.get("uid"),
         course_id=chat_in.course_id,
@@ -33,11 +35,12 @@ async def generate_quiz(
     db: AsyncSession = Depends(deps.get_db),
     quiz_in: schemas.QuizGenerateRequest,
     current_user_token: dict = Depends(security.get_current_user),
+    registry: ProviderRegistry = Depends(get_ai_registry),
 ) -> Any:
     """
     Generate a quiz for a lesson.
     """
-    quiz_service = QuizGeneratorService(db)
+    quiz_service = QuizGeneratorService(db, registry=registry)
     quiz = await quiz_service.generate_lesson_quiz(lesson_id=quiz_in.lesson_id)
     
     if "error" in quiz:
@@ -51,11 +54,12 @@ async def explain_code(
     db: AsyncSession = Depends(deps.get_db),
     code_in: schemas.CodeExplainRequest,
     current_user_token: dict = Depends(security.get_current_user),
+    registry: ProviderRegistry = Depends(get_ai_registry),
 ) -> Any:
     """
     Get AI explanation for a code snippet.
     """
-    code_service = CodeAssistantService(db)
+    code_service = CodeAssistantService(db, registry=registry)
     explanation = await code_service.explain_code(
         code=code_in.code,
         language=code_in.language
@@ -68,11 +72,12 @@ async def generate_course(
     db: AsyncSession = Depends(deps.get_db),
     course_in: schemas.CourseGenerateRequest,
     current_user_token: dict = Depends(security.get_current_user),
+    registry: ProviderRegistry = Depends(get_ai_registry),
 ) -> Any:
     """
     Generate a complete course structure using AI.
     """
-    service = CourseGeneratorService(db)
+    service = CourseGeneratorService(db, registry=registry)
     result = await service.generate_course(
         user_id=current_user_token.get("uid"),
         topic=course_in.topic,
@@ -1,25 +1,64 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import schemas
+from app import schemas, models
 from app.db import session as deps
 from app.core import security
+from app.core.http_cache import cache_headers, make_etag, not_modified
+from app.core.serialization import PreSerializedJSONResponse, json_array
 from app.crud import crud_course as crud
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.Course])
+@router.get("/", response_model=List[schemas.CourseOutline])
 async def read_courses(
-    db: AsyncSession = Depends(deps.get_db),
+    request: Request,
+    db: AsyncSession = Depends(deps.get_read_db),
     skip: int = 0,
     limit: int = 100,
 ) -> Any:
     """
     Retrieve courses.
     """
-    courses = await crud.course.get_multi(db, skip=skip, limit=limit)
-    return courses
+    versions = await crud.course.get_multi_versions(db, skip=skip, limit=limit)
+    etag = make_etag("courses", skip, limit, versions)
+    headers = cache_headers(etag, public=all(is_published for _, _, is_published in versions))
+    if not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    trees = await crud.course.get_trees(db, {id: version for id, version, _ in versions})
+    body = json_array(trees[id].body for id, _, _ in versions if id in trees)
+    return PreSerializedJSONResponse(body, headers=headers)
+
+@router.get("/catalog", response_model=schemas.CourseCatalogPage)
+async def read_catalog(
+    db: AsyncSession = Depends(deps.get_read_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    is_published: Optional[bool] = None,
+    instructor_id: Optional[str] = None,
+) -> Any:
+    """
+    Browse course summaries (with module/lesson counts), newest first.
+    Pass `next_cursor` from the previous page to continue.
+    """
+    try:
+        after = crud.decode_catalog_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    items, next_after = await crud.course.get_catalog(
+        db,
+        limit=limit,
+        cursor=after,
+        is_published=is_published,
+        instructor_id=instructor_id,
+    )
+    return {
+        "items": items,
+        "next_cursor": crud.encode_catalog_cursor(*next_after) if next_after else None,
+    }
 
 @router.post("/", response_model=schemas.Course)
 async def create_course(
@@ -34,21 +73,59 @@ async def create_course(
     # Instructor is the current user
     return await crud.course.create(db=db, obj_in=course_in, instructor_id=current_user["uid"])
 
-@router.get("/{id}", response_model=schemas.Course)
-async def read_course(
+@router.post("/import", response_model=schemas.CourseOutline)
+async def import_course(
     *,
     db: AsyncSession = Depends(deps.get_db),
+    course_in: schemas.CourseTreeCreate,
+    current_user: dict = Depends(security.get_current_user),
+) -> Any:
+    """
+    Create a course together with its modules and lessons in one transaction.
+    """
+    course_id = await crud.course.create_tree(db=db, obj_in=course_in, instructor_id=current_user["uid"])
+    tree = await crud.course.get_tree(db, id=course_id)
+    return PreSerializedJSONResponse(tree.body)
+
+@router.get("/lessons/{lesson_id}", response_model=schemas.Lesson)
+async def read_lesson(
+    *,
+    db: AsyncSession = Depends(deps.get_read_db),
+    lesson_id: int,
+) -> Any:
+    """
+    Get a single lesson including its Markdown content.
+    """
+    lesson = await crud.lesson.get(db, id=lesson_id)
+    if not lesson:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    return lesson
+
+@router.get("/{id}", response_model=schemas.CourseOutline)
+async def read_course(
+    *,
+    db: AsyncSession = Depends(deps.get_read_db),
     id: int,
+    request: Request,
 ) -> Any:
     """
-    Get course by ID.
+    Get a course outline by ID (lesson content: GET /courses/lessons/{lesson_id}).
+    Honors If-None-Match / If-Modified-Since without loading the course tree.
     """
-    course = await crud.course.get(db, id=id)
+    validators = await crud.course.get_validators(db, id=id)
+    if not validators:
+        raise HTTPException(status_code=404, detail="Course not found")
+    etag = make_etag("course", id, validators["version"])
+    headers = cache_headers(etag, validators["last_modified"], public=validators["is_published"])
+    if not_modified(request, etag, validators["last_modified"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    course = await crud.course.get_tree(db, id=id, version=validators["version"])
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
-    return course
+    return PreSerializedJSONResponse(course.body, headers=headers)
 
-@router.put("/{id}", response_model=schemas.Course)
+@router.put("/{id}", response_model=schemas.CourseOutline)
 async def update_course(
     *,
     db: AsyncSession = Depends(deps.get_db),
@@ -59,13 +136,15 @@ async def update_course(
     """
     Update a course.
     """
-    course = await crud.course.get(db, id=id)
+    # Plain row lookup for the ownership check; the tree is only loaded for the response
+    course = await db.get(models.course.Course, id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     if course.instructor_id != current_user["uid"]:
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    course = await crud.course.update(db=db, db_obj=course, obj_in=course_in)
-    return course
+    await crud.course.update(db=db, db_obj=course, obj_in=course_in)
+    tree = await crud.course.get_tree(db, id=id)
+    return PreSerializedJSONResponse(tree.body)
 
 @router.delete("/{id}", response_model=schemas.Course)
 async def delete_course(
@@ -77,10 +156,10 @@ async def delete_course(
     """
     Delete a course.
     """
-    course = await crud.course.get(db, id=id)
-    if not course:
+    instructor_id = await crud.course.get_instructor_id(db, id=id)
+    if not instructor_id:
         raise HTTPException(status_code=404, detail="Course not found")
-    if course.instructor_id != current_user["uid"]:
+    if instructor_id != current_user["uid"]:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     course = await crud.course.remove(db=db, id=id)
     return course
@@ -98,10 +177,10 @@ async def create_module(
     """
     Create a module for a course.
     """
-    course = await crud.course.get(db, id=course_id)
-    if not course:
+    instructor_id = await crud.course.get_instructor_id(db, id=course_id)
+    if not instructor_id:
         raise HTTPException(status_code=404, detail="Course not found")
-    if course.instructor_id != current_user["uid"]:
+    if instructor_id != current_user["uid"]:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     return await crud.module.create(db=db, obj_in=module_in, course_id=course_id)
 
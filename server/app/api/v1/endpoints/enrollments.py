@@ -1,15 +1,53 @@
 from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from sqlalchemy import func
 
-from app import schemas, models
+from app import schemas
 from app.db import session as deps
 from app.core import security
+from app.core.http_cache import cache_headers, make_etag, not_modified
+from app.core.serialization import PreSerializedJSONResponse, json_array_with_field
+from app.crud import user as crud_user
+from app.crud.crud_course import course as crud_course
+from app.crud.crud_enrollment import enrollment as crud_enrollment
+from app.crud.crud_progress import progress_percent
+from app.services.enrollment_import import EnrollmentImportService, import_format
 
 router = APIRouter()
 
+@router.post("/bulk", response_model=schemas.EnrollmentBulkResult)
+async def bulk_enroll(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    request: Request,
+    course_id: int = Query(...),
+    current_user: dict = Depends(security.get_current_user),
+) -> Any:
+    """
+    Enroll a cohort into a course (course instructor or superuser only).
+    The body is streamed CSV (`user_id` and/or `email` columns, or one identifier
+    per line) or NDJSON (`{"user_id": ...}` / `{"email": ...}` per line).
+    """
+    fmt = import_format(request.headers.get("content-type"))
+    if not fmt:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Expected text/csv or application/x-ndjson",
+        )
+        
+    instructor_id = await crud_course.get_instructor_id(db, id=course_id)
+    if not instructor_id:
+        raise HTTPException(status_code=404, detail="Course not found")
+    if instructor_id != current_user["uid"]:
+        db_user = await crud_user.get(db, current_user["uid"])
+        if not db_user or not db_user.is_superuser:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    try:
+        return await EnrollmentImportService(db).run(course_id=course_id, chunks=request.stream(), fmt=fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/{course_id}/enroll", response_model=schemas.EnrollmentResponse)
 async def enroll_in_course(
     *,
@@ -21,38 +59,19 @@ async def enroll_in_course(
     Enroll the current user in a course.
     """
     uid = current_user["uid"]
-    
-    # Check if course exists
-    result = await db.execute(select(models.course.Course).filter(models.course.Course.id == course_id))
-    course = result.scalars().first()
-    if not course:
+    enrollment = await crud_enrollment.upsert(db, user_id=uid, course_id=course_id)
+    if not enrollment:
+        # Either foreign key can fail; an unprovisioned user is not a missing course
+        if not await crud_user.get(db, uid):
+            raise HTTPException(status_code=404, detail="User not found")
         raise HTTPException(status_code=404, detail="Course not found")
-        
-    # Check if already enrolled
-    result = await db.execute(
-        select(models.enrollment.Enrollment).filter(
-            models.enrollment.Enrollment.user_id == uid,
-            models.enrollment.Enrollment.course_id == course_id
-        )
-    )
-    enrollment = result.scalars().first()
-    if enrollment:
-        return enrollment
-
-    # Create new enrollment
-    enrollment = models.enrollment.Enrollment(
-        user_id=uid,
-        course_id=course_id
-    )
-    db.add(enrollment)
-    await db.commit()
-    await db.refresh(enrollment)
     return enrollment
 
 @router.get("/my-courses", response_model=List[schemas.enrollment.CourseWithProgress])
 async def get_my_courses(
     *,
     db: AsyncSession = Depends(deps.get_db),
+    request: Request,
     current_user: dict = Depends(security.get_current_user),
 ) -> Any:
     """
@@ -60,26 +79,21 @@ async def get_my_courses(
     """
     uid = current_user["uid"]
     
-    from sqlalchemy.orm import selectinload
-    result = await db.execute(
-        select(models.course.Course)
-        .options(selectinload(models.course.Course.modules).selectinload(models.course.Module.lessons))
-        .join(models.enrollment.Enrollment)
-        .filter(models.enrollment.Enrollment.user_id == uid)
-    )
-    db_courses = result.scalars().all()
+    # Course versions plus progress counters determine the whole response
+    versions = await crud_enrollment.get_course_versions(db, user_id=uid)
+    etag = make_etag("my-courses", uid, versions)
+    headers = cache_headers(etag)
+    if not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
-    courses_with_progress = []
-    from app.crud.crud_course import course as crud_course
-    for db_course in db_courses:
-        progress = await crud_course.get_course_progress(db, course_id=db_course.id, user_id=uid)
-        
-        # Convert SQLAlchemy object to Pydantic and add progress
-        course_data = schemas.course.Course.model_validate(db_course)
-        course_with_progress = schemas.enrollment.CourseWithProgress(
-            **course_data.model_dump(),
-            progress=progress
-        )
-        courses_with_progress.append(course_with_progress)
-        
-    return courses_with_progress
+    # Shared cached tree bytes, with the user's progress appended to each
+    trees = await crud_course.get_trees(db, {course_id: version for course_id, version, *_ in versions})
+    body = json_array_with_field(
+        (
+            (trees[course_id].body, progress_percent(completed_count, total_lessons))
+            for course_id, _, completed_count, total_lessons in versions
+            if course_id in trees
+        ),
+        "progress",
+    )
+    return PreSerializedJSONResponse(body, headers=headers)
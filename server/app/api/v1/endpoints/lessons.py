@@ -0,0 +1,25 @@
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas
+from app.db import session as deps
+from app.core.serialization import PreSerializedJSONResponse
+from app.crud import crud_course as crud
+
+router = APIRouter()
+
+@router.get("/{id}/context", response_model=schemas.LessonContext)
+async def read_lesson_context(
+    *,
+    db: AsyncSession = Depends(deps.get_read_db),
+    id: int,
+) -> Any:
+    """
+    Get a lesson with its module, position in the course and previous/next lessons.
+    Independent of course size; cached per course version.
+    """
+    body = await crud.lesson.get_context_json(db, id=id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    return PreSerializedJSONResponse(body)
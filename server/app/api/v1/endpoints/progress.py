@@ -1,18 +1,94 @@
 from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app import schemas, models
 from app.db import session as deps
 from app.core import security
+from app.core.config import settings
+from app.core.http_cache import cache_headers, etag_matches, make_etag
+from app.crud import user as crud_user
+from app.crud.crud_progress import course_progress, progress as crud_progress
+from app.services.progress_buffer import progress_buffer
 
 router = APIRouter()
 
+@router.post("/batch", response_model=List[schemas.UserProgress])
+async def sync_progress(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    items: List[schemas.UserProgressBatchItem],
+    current_user: dict = Depends(security.get_current_user),
+) -> Any:
+    """
+    Apply many progress updates at once (offline sync, tab restore).
+    Conflicts are resolved by `client_timestamp` (last writer wins); the
+    response is the merged state of every lesson in the batch.
+    """
+    if len(items) > settings.PROGRESS_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.PROGRESS_BATCH_MAX_ITEMS} items per batch",
+        )
+    uid = current_user["uid"]
+    
+    # The batch is the client's latest word on these lessons
+    for item in items:
+        progress_buffer.discard(uid, item.lesson_id)
+    
+    return await crud_progress.apply_batch(db, user_id=uid, items=items)
+
+@router.get("/course/{course_id}", response_model=List[schemas.UserProgress])
+async def read_course_progress(
+    *,
+    db: AsyncSession = Depends(deps.get_read_db),
+    course_id: int,
+    request: Request,
+    response: Response,
+    current_user: dict = Depends(security.get_current_user),
+) -> Any:
+    """
+    Get user progress for every lesson in a course, in outline order.
+    Supports If-None-Match so polling clients get 304 when nothing changed.
+    """
+    uid = current_user["uid"]
+    rows = await crud_progress.get_course_lessons(db, user_id=uid, course_id=course_id)
+    
+    items = []
+    for lesson_id, is_completed, video_progress, last_accessed in rows:
+        buffered = progress_buffer.peek(uid, lesson_id)
+        items.append({
+            "user_id": uid,
+            "lesson_id": lesson_id,
+            "is_completed": bool(is_completed),
+            "video_progress": buffered if buffered is not None else (video_progress or 0.0),
+            "last_accessed": last_accessed,
+        })
+    
+    touched = [row[3] for row in rows if row[3] is not None]
+    etag = make_etag(
+        uid,
+        course_id,
+        len(rows),
+        len(touched),
+        max(touched) if touched else None,
+        sum(1 for item in items if item["is_completed"]),
+        # Unflushed heartbeats aren't reflected in last_accessed yet
+        sum(item["video_progress"] for item in items),
+    )
+    headers = cache_headers(etag)
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    response.headers.update(headers)
+    return items
+
 @router.get("/{lesson_id}", response_model=schemas.UserProgress)
 async def read_progress(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     lesson_id: int,
     current_user: dict = Depends(security.get_current_user),
 ) -> Any:
@@ -26,18 +102,26 @@ async def read_progress(
         )
     )
     progress = result.scalars().first()
+    buffered = progress_buffer.peek(current_user["uid"], lesson_id)
     if not progress:
         # Return default empty progress
         return {
             "user_id": current_user["uid"],
             "lesson_id": lesson_id,
             "is_completed": False,
-            "video_progress": 0.0,
+            "video_progress": buffered if buffered is not None else 0.0,
             "last_accessed": None
         }
+    if buffered is not None:
+        # Read-your-writes for heartbeats that haven't been flushed yet
+        return schemas.UserProgress.model_validate(progress).model_copy(update={"video_progress": buffered})
     return progress
 
-@router.post("/{lesson_id}", response_model=schemas.UserProgress)
+@router.post(
+    "/{lesson_id}",
+    response_model=schemas.UserProgress,
+    responses={status.HTTP_202_ACCEPTED: {"model": schemas.UserProgressHeartbeat}},
+)
 async def update_progress(
     *,
     db: AsyncSession = Depends(deps.get_db),
@@ -47,31 +131,43 @@ async def update_progress(
 ) -> Any:
     """
     Update or create user progress for a lesson.
+    Heartbeats are buffered and written in batches (202 Accepted, with only the
+    accepted position: completion state isn't known without a read). A heartbeat
+    moves `video_progress` and may carry `is_completed: false`, as the video
+    player sends below its completion threshold; buffering only ever writes the
+    position, so a heartbeat never clears a stored completion. Completing a
+    lesson, or un-completing it without a position, is written synchronously.
     """
     uid = current_user["uid"]
     
-    result = await db.execute(
-        select(models.progress.UserProgress).filter(
-            models.progress.UserProgress.user_id == uid,
-            models.progress.UserProgress.lesson_id == lesson_id
-        )
+    is_heartbeat = (
+        "video_progress" in progress_in.model_fields_set
+        and progress_in.model_fields_set <= {"video_progress", "is_completed"}
+        and not progress_in.is_completed
     )
-    db_obj = result.scalars().first()
+    if settings.PROGRESS_BUFFER_ENABLED and is_heartbeat:
+        progress_buffer.add(uid, lesson_id, progress_in.video_progress)
+        accepted = schemas.UserProgressHeartbeat(
+            user_id=uid, lesson_id=lesson_id, video_progress=progress_in.video_progress
+        )
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=accepted.model_dump())
+    
+    # A synchronous write supersedes any buffered heartbeat for this lesson
+    progress_buffer.discard(uid, lesson_id)
     
-    if db_obj:
-        # Update existing
-        update_data = progress_in.model_dump(exclude_unset=True)
-        for field in update_data:
-            setattr(db_obj, field, update_data[field])
-    else:
-        # Create new
-        db_obj = models.progress.UserProgress(
-            user_id=uid,
-            lesson_id=lesson_id,
-            **progress_in.model_dump()
+    upserted = await crud_progress.upsert(db, user_id=uid, lesson_id=lesson_id, obj_in=progress_in)
+    if not upserted:
+        # Either foreign key can fail; an unprovisioned user is not a missing lesson
+        if not await crud_user.get(db, uid):
+            raise HTTPException(status_code=404, detail="User not found")
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    db_obj, was_completed = upserted
+        
+    # Keep the per-course counters in the same transaction
+    if bool(db_obj.is_completed) != was_completed:
+        await course_progress.apply_completion_delta(
+            db, user_id=uid, lesson_id=lesson_id, delta=1 if db_obj.is_completed else -1
         )
-        db.add(db_obj)
         
     await db.commit()
-    await db.refresh(db_obj)
     return db_obj
@@ -0,0 +1,31 @@
+from typing import Any
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas
+from app.db import session as deps
+from app.services.search.factory import get_search_backend
+
+router = APIRouter()
+
+@router.get("/", response_model=schemas.SearchPage)
+async def search(
+    db: AsyncSession = Depends(deps.get_read_db),
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=1000),
+) -> Any:
+    """
+    Ranked full-text search over course titles and descriptions and lesson titles
+    and content, with highlighted snippets. Pass `next_offset` to get the next page.
+    Public and unauthenticated, so only published courses are searched.
+    """
+    backend = get_search_backend(db.bind.dialect.name)
+    hits = await backend.search(db, q, limit=limit + 1, offset=offset, published_only=True)
+    return {
+        "query": q,
+        "items": hits[:limit],
+        "limit": limit,
+        "offset": offset,
+        "next_offset": offset + limit if len(hits) > limit else None,
+    }
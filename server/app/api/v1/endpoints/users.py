@@ -21,21 +21,26 @@ async def read_user_me(
     uid = current_user_token.get("uid")
     email = current_user_token.get("email")
     
-    user = await crud_user.get(db, id=uid)
-    
-    if not user:
-        # Auto-register user from Firebase token
-        if not email:
-             raise HTTPException(status_code=400, detail="Email not found in token")
-             
+    user = None
+    if email and not await crud_user.is_known(uid):
+        # Auto-register user from Firebase token (no-op if the row already exists)
         user_in = schemas.UserCreate(
             id=uid,
             email=email,
             full_name=current_user_token.get("name"),
             is_active=True
         )
-        user = await crud_user.create(db, obj_in=user_in)
+        user = await crud_user.ensure(db, obj_in=user_in)
+        
+    if not user:
+        user = await crud_user.get(db, id=uid)
+    
+    if not user:
+        if not email:
+             raise HTTPException(status_code=400, detail="Email not found in token")
+        raise HTTPException(status_code=409, detail="Email is already registered to another account")
         
+    await crud_user.mark_known(uid)
     return user
 
 @router.put("/me", response_model=schemas.User)
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import ClassVar, List
+from typing import Any, ClassVar, Dict, List
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "EduGenius AI"
@@ -17,6 +17,19 @@ class Settings(BaseSettings):
     # Database
     SUPABASE_URL: str = ""
     SUPABASE_KEY: str = ""
+    SUPABASE_READ_URL: str | None = None # Optional read replica
+    
+    # Engine profile ("dev" or "prod"); the DB_* values below override it when set
+    DB_ENGINE_PROFILE: str = "dev"
+    DB_ECHO: bool | None = None
+    DB_POOL_SIZE: int | None = None
+    DB_MAX_OVERFLOW: int | None = None
+    DB_POOL_RECYCLE: int | None = None
+    DB_STATEMENT_TIMEOUT_MS: int | None = None
+
+    # Per-request SQL counting (Server-Timing header, /metrics) and N+1 warnings
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5 # identical statement shapes per request
     
     # Auth
     SECRET_KEY: str = "your-secret-key-here" # Change in production!
@@ -28,10 +41,80 @@ class Settings(BaseSettings):
     FIREBASE_PRIVATE_KEY: str | None = None
     FIREBASE_CLIENT_EMAIL: str | None = None
     FIREBASE_WEB_API_KEY: str | None = None
-    
+
+    # Verified ID token cache (TTL is further capped by each token's `exp`)
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    AUTH_TOKEN_CACHE_TTL_SECONDS: int = 300
+    AUTH_VERIFY_MAX_WORKERS: int = 4
+
+    # "local" verifies RS256 ID tokens offline against in-memory signing keys;
+    # "firebase" always defers to firebase_admin.auth.verify_id_token
+    AUTH_VERIFIER: str = "local"
+    AUTH_PUBLIC_KEYS_URL: str = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+    AUTH_PUBLIC_KEYS_FILE: str | None = None # JSON {kid: PEM}, overrides the URL
+    AUTH_KEY_REFRESH_MIN_SECONDS: int = 60
+    AUTH_KEY_REFRESH_DEFAULT_SECONDS: int = 3600
+    AUTH_CLOCK_SKEW_SECONDS: int = 0 # tolerated iat/auth_time drift (firebase_admin allows at most 60)
+
+    # Shared cache (optional, e.g. redis://localhost:6379/0); in-process caches are used without it
+    CACHE_REDIS_URL: str | None = None
+    KNOWN_USERS_CACHE_SIZE: int = 100000
+    COURSE_CACHE_SIZE: int = 1000
+    COURSE_CACHE_TTL_SECONDS: int = 300
+    LESSON_CONTEXT_CACHE_SIZE: int = 10000
+
+    # HTTP caching of published course responses (browser / CDN)
+    HTTP_CACHE_MAX_AGE_SECONDS: int = 60
+    HTTP_CACHE_SHARED_MAX_AGE_SECONDS: int = 300
+
+    # Write-behind buffering of video progress heartbeats
+    PROGRESS_BUFFER_ENABLED: bool = True
+    PROGRESS_FLUSH_INTERVAL_SECONDS: float = 5.0
+    PROGRESS_BUFFER_MAX_SIZE: int = 5000 # pending rows that trigger an early flush
+    PROGRESS_BATCH_MAX_ITEMS: int = 500
+
+    # Bulk cohort enrollment: rows resolved and inserted per statement
+    ENROLLMENT_IMPORT_BATCH_SIZE: int = 1000
+
     # AI Providers
     GOOGLE_API_KEY: str = ""
     OPENAI_API_KEY: str = ""
+
+    # Pooled HTTP clients shared by all AI requests (one per provider)
+    AI_HTTP_MAX_CONNECTIONS: int = 100
+    AI_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    AI_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    AI_HTTP_TIMEOUT_SECONDS: float = 120.0
+    AI_HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    AI_MAX_RETRIES: int = 2
+
+    # Model per TaskType: {"provider", "model", "max_tokens", "timeout", "fallbacks": [...]}.
+    # Tasks without a route use "general"; embeddings always use "embedding".
+    AI_MODEL_ROUTES: Dict[str, Dict[str, Any]] = {
+        "general": {"model": "gemini-2.0-flash", "fallbacks": ["gemini-2.0-flash-lite"]},
+        "chat": {"model": "gemini-2.0-flash", "max_tokens": 2048, "timeout": 60, "fallbacks": ["gemini-2.0-flash-lite"]},
+        "expansion": {"model": "gemini-2.0-flash-lite", "max_tokens": 64, "timeout": 10, "fallbacks": ["gemini-2.0-flash"]},
+        "summary": {"model": "gemini-2.0-flash-lite", "max_tokens": 1024, "timeout": 30, "fallbacks": ["gemini-2.0-flash"]},
+        "coding": {"model": "gemini-2.0-flash", "max_tokens": 4096, "timeout": 90, "fallbacks": ["gemini-2.0-flash-lite"]},
+        "quiz": {"model": "gemini-2.0-flash", "max_tokens": 4096, "timeout": 90, "fallbacks": ["gemini-2.0-flash-lite"]},
+        "course": {"model": "gemini-2.0-flash", "max_tokens": 8192, "timeout": 180},
+        "embedding": {"model": "text-embedding-004", "timeout": 30},
+    }
+
+    # Exact-match cache of LLM responses (quizzes, code explanations, ...).
+    # "memory" is per process; "sql" adds the shared ai_response_cache table behind it.
+    AI_RESPONSE_CACHE_ENABLED: bool = True
+    AI_RESPONSE_CACHE_BACKEND: str = "memory"
+    AI_RESPONSE_CACHE_SIZE: int = 2000
+    AI_RESPONSE_CACHE_MAX_ROWS: int = 50000
+    AI_RESPONSE_CACHE_TTL_SECONDS: int = 86400
+
+    # Tutor answers reused for similar first-turn questions in the same course
+    AI_SEMANTIC_CACHE_ENABLED: bool = True
+    AI_SEMANTIC_CACHE_THRESHOLD: float = 0.92 # cosine similarity of question embeddings
+    AI_SEMANTIC_CACHE_MAX_ENTRIES_PER_COURSE: int = 500
+    AI_SEMANTIC_CACHE_MAX_COURSES: int = 1000
+    AI_SEMANTIC_CACHE_TTL_SECONDS: int = 86400
     
     # Vector DB
     PINECONE_API_KEY: str = ""
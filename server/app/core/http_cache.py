@@ -0,0 +1,75 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+
+from app.core.config import settings
+
+
+def make_etag(*parts: Any, weak: bool = True) -> str:
+    """Build an ETag from the values that determine a response's content."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:32]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def _opaque(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison against If-None-Match, as required for conditional GETs."""
+    header: Optional[str] = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(_opaque(candidate.strip()) == _opaque(etag) for candidate in header.split(","))
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands back naive timestamps; they are stored in UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_utc(value).replace(microsecond=0), usegmt=True)
+
+
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    True when the client's copy is current. If-None-Match takes precedence;
+    If-Modified-Since is only consulted when no ETag was sent.
+    """
+    if request.headers.get("if-none-match"):
+        return etag_matches(request, etag)
+
+    since = request.headers.get("if-modified-since")
+    if not since or last_modified is None:
+        return False
+    try:
+        since_dt = parsedate_to_datetime(since)
+    except (TypeError, ValueError):
+        return False
+    return _utc(last_modified).replace(microsecond=0) <= _utc(since_dt)
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime] = None, public: bool = False) -> Dict[str, str]:
+    """
+    Validator and Cache-Control headers. Public responses may be stored by a CDN
+    (s-maxage) and revalidated with the validators; private ones only by the browser.
+    """
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if public:
+        headers["Cache-Control"] = (
+            f"public, max-age={settings.HTTP_CACHE_MAX_AGE_SECONDS}, "
+            f"s-maxage={settings.HTTP_CACHE_SHARED_MAX_AGE_SECONDS}"
+        )
+    else:
+        headers["Cache-Control"] = "private, no-cache"
+    return headers
@@ -1,9 +1,26 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
 import firebase_admin
 from firebase_admin import auth, credentials
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Optional
+from jose import jwt
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.crud import user as crud_user
+from app.db import session as deps
+
+logger = logging.getLogger(__name__)
 
 # Initialize Firebase Admin
 try:
@@ -36,12 +53,232 @@ except Exception as e:
 
 security = HTTPBearer()
 
+# --- Local (offline) ID token verification ---
+
+class UnknownSigningKeyError(Exception):
+    """The token was signed with a key id that is not in the current key set."""
+
+class KeySource(ABC):
+    """
+    Supplies the public signing certificates used to verify ID tokens.
+    """
+
+    @abstractmethod
+    async def fetch(self) -> Tuple[Dict[str, str], Optional[float]]:
+        """Return ({kid: PEM certificate}, max-age in seconds or None)."""
+        pass
+
+class HTTPKeySource(KeySource):
+    """Google's published x509 certificates, honoring Cache-Control max-age."""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+
+    async def fetch(self) -> Tuple[Dict[str, str], Optional[float]]:
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            response = await client.get(self.url)
+            response.raise_for_status()
+
+        max_age = None
+        match = re.search(r"max-age=(\d+)", response.headers.get("cache-control", ""))
+        if match:
+            max_age = float(match.group(1))
+        return response.json(), max_age
+
+class FileKeySource(KeySource):
+    """A local JSON file of {kid: PEM certificate}, e.g. for tests and offline development."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    async def fetch(self) -> Tuple[Dict[str, str], Optional[float]]:
+        def _read() -> Dict[str, str]:
+            with open(self.path, "r") as f:
+                return json.load(f)
+
+        return await asyncio.to_thread(_read), None
+
+class PublicKeyVerifier:
+    """
+    Verifies Firebase ID tokens (RS256) against an in-memory key set.
+    Keys are refreshed by a background task, so verification never touches the network.
+    """
+
+    def __init__(
+        self,
+        source: KeySource,
+        project_id: str,
+        min_refresh_seconds: float = 60,
+        default_refresh_seconds: float = 3600,
+        clock_skew_seconds: float = 0,
+    ):
+        self.source = source
+        self.project_id = project_id
+        self.issuer = f"https://securetoken.google.com/{project_id}"
+        self.min_refresh_seconds = min_refresh_seconds
+        self.default_refresh_seconds = default_refresh_seconds
+        self.clock_skew_seconds = clock_skew_seconds
+        self._keys: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._last_refresh = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._keys)
+
+    async def refresh(self) -> float:
+        """Reload the key set and return the delay until the next refresh."""
+        self._last_refresh = time.monotonic()
+        keys, max_age = await self.source.fetch()
+        self._keys = dict(keys)
+        logger.info(f"Loaded {len(self._keys)} token signing keys")
+        return max(self.min_refresh_seconds, max_age or self.default_refresh_seconds)
+
+    async def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        try:
+            delay = await self.refresh()
+        except Exception as e:
+            logger.warning(f"Initial signing key fetch failed: {e}")
+            delay = self.min_refresh_seconds
+        self._task = asyncio.create_task(self._refresh_loop(delay))
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def request_refresh(self) -> None:
+        """Ask the background task to refresh early (e.g. after an unknown `kid`)."""
+        if self._wakeup:
+            self._wakeup.set()
+
+    async def _refresh_loop(self, delay: float) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                # Woken early: still respect the minimum interval between fetches
+                elapsed = time.monotonic() - self._last_refresh
+                await asyncio.sleep(max(0.0, self.min_refresh_seconds - elapsed))
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                delay = await self.refresh()
+            except Exception as e:
+                logger.warning(f"Signing key refresh failed, keeping current keys: {e}")
+                delay = self.min_refresh_seconds
+
+    def verify(self, id_token: str) -> Dict[str, Any]:
+        """
+        Verify signature and standard Firebase claims. Pure CPU, safe to run in a thread.
+        """
+        header = jwt.get_unverified_header(id_token)
+        if header.get("alg") != "RS256":
+            raise jwt.JWTError("Unexpected token algorithm")
+
+        certificate = self._keys.get(header.get("kid"))
+        if certificate is None:
+            raise UnknownSigningKeyError(header.get("kid"))
+
+        claims = jwt.decode(
+            id_token,
+            certificate,
+            algorithms=["RS256"],
+            audience=self.project_id,
+            issuer=self.issuer,
+            options={"verify_at_hash": False},
+        )
+
+        subject = claims.get("sub")
+        if not subject or not isinstance(subject, str) or len(subject) > 128:
+            raise jwt.JWTError("Invalid token subject")
+        # Same rules as firebase_admin: issued-at and auth time may not be in the future
+        latest = time.time() + self.clock_skew_seconds
+        issued_at = claims.get("iat")
+        if not isinstance(issued_at, (int, float)) or isinstance(issued_at, bool):
+            raise jwt.JWTError("Token has no valid iat claim")
+        if issued_at > latest:
+            raise jwt.JWTError("Token iat is in the future")
+        if claims.get("auth_time", 0) > latest:
+            raise jwt.JWTError("Token auth_time is in the future")
+
+        claims["uid"] = subject
+        return claims
+
+def _build_token_verifier() -> Optional[PublicKeyVerifier]:
+    if settings.AUTH_VERIFIER != "local" or not settings.FIREBASE_PROJECT_ID:
+        return None
+    if settings.AUTH_PUBLIC_KEYS_FILE:
+        source: KeySource = FileKeySource(settings.AUTH_PUBLIC_KEYS_FILE)
+    else:
+        source = HTTPKeySource(settings.AUTH_PUBLIC_KEYS_URL)
+    return PublicKeyVerifier(
+        source,
+        project_id=settings.FIREBASE_PROJECT_ID,
+        min_refresh_seconds=settings.AUTH_KEY_REFRESH_MIN_SECONDS,
+        default_refresh_seconds=settings.AUTH_KEY_REFRESH_DEFAULT_SECONDS,
+        clock_skew_seconds=settings.AUTH_CLOCK_SKEW_SECONDS,
+    )
+
+# None when local verification is disabled; started/stopped in the app lifespan
+token_verifier = _build_token_verifier()
+
+def _verify_token_sync(id_token: str) -> Dict[str, Any]:
+    if token_verifier is not None and token_verifier.ready:
+        return token_verifier.verify(id_token)
+    # Keys not loaded (or local verification disabled): defer to the Admin SDK
+    return auth.verify_id_token(id_token)
+
+# Decoded claims of recently verified tokens, keyed by the SHA-256 of the raw token
+token_cache = TTLCache(
+    maxsize=settings.AUTH_TOKEN_CACHE_SIZE,
+    ttl=settings.AUTH_TOKEN_CACHE_TTL_SECONDS,
+)
+
+# Bounded pool so signature checks and certificate fetches never run on the event loop
+_verify_executor = ThreadPoolExecutor(
+    max_workers=settings.AUTH_VERIFY_MAX_WORKERS,
+    thread_name_prefix="token-verify",
+)
+
+async def verify_token(id_token: str) -> Dict[str, Any]:
+    """
+    Verifies an ID token, serving repeat tokens from the cache.
+    Cache entries never outlive the token's own `exp` claim.
+    """
+    key = hashlib.sha256(id_token.encode("utf-8")).hexdigest()
+    decoded_token = token_cache.get(key)
+    if decoded_token is not None:
+        return decoded_token
+
+    loop = asyncio.get_running_loop()
+    try:
+        decoded_token = await loop.run_in_executor(_verify_executor, _verify_token_sync, id_token)
+    except UnknownSigningKeyError:
+        token_verifier.request_refresh()
+        raise
+
+    ttl = min(settings.AUTH_TOKEN_CACHE_TTL_SECONDS, decoded_token.get("exp", 0) - time.time())
+    if ttl > 0:
+        token_cache.set(key, decoded_token, ttl=ttl)
+    return decoded_token
+
+def get_token_cache_stats() -> Dict[str, Any]:
+    return token_cache.stats()
+
 async def get_current_user(token: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """
     Verifies the Firebase ID token and returns the decoded user data.
     """
     try:
-        decoded_token = auth.verify_id_token(token.credentials)
+        decoded_token = await verify_token(token.credentials)
         return decoded_token
     except Exception as e:
         raise HTTPException(
@@ -49,3 +286,15 @@ async def get_current_user(token: HTTPAuthorizationCredentials = Depends(securit
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+async def get_current_superuser(
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: dict = Depends(get_current_user),
+) -> dict:
+    """
+    Like get_current_user, but only for users flagged as superusers.
+    """
+    db_user = await crud_user.get(db, current_user["uid"])
+    if not db_user or not db_user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    return current_user
@@ -0,0 +1,41 @@
+import json
+from typing import Any, Iterable, Tuple
+
+from fastapi import Response
+
+
+class PreSerializedJSONResponse(Response):
+    """
+    JSON response whose body is already encoded bytes. Returning it from an
+    endpoint bypasses FastAPI's response_model validation and JSON encoding,
+    so the payload is serialized exactly once.
+    """
+    media_type = "application/json"
+
+
+def json_array(items: Iterable[bytes]) -> bytes:
+    """Join already-encoded JSON values into a JSON array (one copy of the items)."""
+    parts = [b"["]
+    for item in items:
+        if len(parts) > 1:
+            parts.append(b",")
+        parts.append(item)
+    parts.append(b"]")
+    return b"".join(parts)
+
+
+def json_array_with_field(items: Iterable[Tuple[bytes, Any]], name: str) -> bytes:
+    """
+    Like json_array for (encoded object, value) pairs, appending the field
+    `name` to each object without decoding it, e.g. to add per-user data to
+    shared cached bodies. Objects must be non-empty. Each body is copied once,
+    straight into the result.
+    """
+    key = b"," + json.dumps(name).encode() + b":"
+    parts = [b"["]
+    for obj, value in items:
+        if len(parts) > 1:
+            parts.append(b",")
+        parts.extend((memoryview(obj)[:-1], key, json.dumps(value).encode(), b"}"))
+    parts.append(b"]")
+    return b"".join(parts)
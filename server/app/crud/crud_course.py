@@ -1,31 +1,233 @@
-from typing import Any, Dict, List, Optional, Union
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
+from sqlalchemy import func, insert, tuple_, update
 
 from app.models.course import Course, Module, Lesson
 from app.schemas.course import (
     CourseCreate, CourseUpdate,
     ModuleCreate, ModuleUpdate,
-    LessonCreate, LessonUpdate
+    LessonCreate, LessonUpdate,
+    CourseTreeCreate
 )
-from app.models.progress import UserProgress
-from sqlalchemy import func
+from app.schemas.course import CourseOutline, LessonContext
+from app.crud.crud_progress import course_progress
+from app.services.course_cache import CachedCourse, CachedLessonContext, course_cache
+
+# Validates straight from the ORM objects and dumps straight to JSON bytes
+course_tree_adapter = TypeAdapter(CourseOutline)
+lesson_context_adapter = TypeAdapter(LessonContext)
+
+# Course trees load lesson titles/order only; Markdown content is fetched per lesson.
+# raiseload turns an accidental access into an error instead of a lazy load per lesson.
+def _tree_options():
+    return selectinload(Course.modules).selectinload(Module.lessons).defer(Lesson.content, raiseload=True)
+
+def _encode_tree(db_obj: Course) -> CachedCourse:
+    tree = course_tree_adapter.validate_python(db_obj, from_attributes=True)
+    return CachedCourse(
+        body=course_tree_adapter.dump_json(tree),
+        version=tree.version,
+        is_published=tree.is_published,
+        last_modified=tree.updated_at or tree.created_at,
+    )
+
+def encode_catalog_cursor(created_at: datetime, id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_catalog_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Raises ValueError for malformed cursors."""
+    try:
+        created_at, id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+async def bump_version(db: AsyncSession, course_id: int) -> None:
+    """Mark a course as changed (HTTP validators). Runs in the caller's transaction."""
+    await db.execute(
+        update(Course)
+        .where(Course.id == course_id)
+        .values(version=Course.version + 1, updated_at=func.now())
+    )
 
 class CRUDCourse:
     async def get(self, db: AsyncSession, id: int) -> Optional[Course]:
         result = await db.execute(
             select(Course)
-            .options(selectinload(Course.modules).selectinload(Module.lessons))
+            .options(_tree_options())
             .filter(Course.id == id)
         )
         return result.scalars().first()
 
+    async def get_tree(self, db: AsyncSession, id: int, version: Optional[int] = None) -> Optional[CachedCourse]:
+        """
+        Course tree encoded as JSON bytes, served from the course cache when the cached
+        copy matches the course's current version. Pass `version` if the caller has
+        already read it; otherwise it is read by primary key.
+        """
+        if version is None:
+            version = (
+                await db.execute(select(Course.version).filter(Course.id == id))
+            ).scalar_one_or_none()
+            if version is None:
+                return None
+        entry = await course_cache.get_tree(id, version)
+        if entry is not None:
+            return entry
+
+        db_obj = await self.get(db, id=id)
+        if not db_obj:
+            return None
+        entry = _encode_tree(db_obj)
+        await course_cache.set_tree(id, entry)
+        return entry
+
+    async def get_trees(self, db: AsyncSession, versions: Dict[int, int]) -> Dict[int, CachedCourse]:
+        """
+        Encoded trees for many courses, given {course_id: current version}: cache hits
+        first, then one eager-loading query for the misses (which are cached for next time).
+        """
+        trees: Dict[int, CachedCourse] = {}
+        missing = []
+        for id, version in versions.items():
+            entry = await course_cache.get_tree(id, version)
+            if entry is not None:
+                trees[id] = entry
+            else:
+                missing.append(id)
+
+        if missing:
+            result = await db.execute(
+                select(Course)
+                .options(_tree_options())
+                .filter(Course.id.in_(missing))
+            )
+            for db_obj in result.scalars().all():
+                entry = _encode_tree(db_obj)
+                await course_cache.set_tree(db_obj.id, entry)
+                trees[db_obj.id] = entry
+        return trees
+
+    async def get_validators(self, db: AsyncSession, id: int) -> Optional[Dict[str, Any]]:
+        """
+        What conditional GETs need (version, publish flag, timestamps) without loading
+        the tree, in one primary-key read. Always read from the database, never the
+        per-worker cache, so every worker computes the same validators.
+        """
+        result = await db.execute(
+            select(Course.version, Course.is_published, Course.created_at, Course.updated_at)
+            .filter(Course.id == id)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        return {
+            "version": row.version,
+            "is_published": row.is_published,
+            "last_modified": row.updated_at or row.created_at,
+        }
+
+    async def get_instructor_id(self, db: AsyncSession, id: int) -> Optional[str]:
+        """
+        Owner of a course without loading the course tree (for permission checks).
+        """
+        result = await db.execute(select(Course.instructor_id).filter(Course.id == id))
+        return result.scalar_one_or_none()
+
     async def get_multi(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Course]:
-        result = await db.execute(select(Course).offset(skip).limit(limit))
+        result = await db.execute(
+            select(Course)
+            .options(_tree_options())
+            .order_by(Course.id)
+            .offset(skip)
+            .limit(limit)
+        )
         return result.scalars().all()
 
+    async def get_multi_versions(
+        self, db: AsyncSession, skip: int = 0, limit: int = 100
+    ) -> List[Tuple[int, int, bool]]:
+        """
+        (id, version, is_published) for the same page as get_multi, without the trees.
+        """
+        result = await db.execute(
+            select(Course.id, Course.version, Course.is_published)
+            .order_by(Course.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def get_catalog(
+        self,
+        db: AsyncSession,
+        *,
+        limit: int = 20,
+        cursor: Optional[Tuple[datetime, int]] = None,
+        is_published: Optional[bool] = None,
+        instructor_id: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[datetime, int]]]:
+        """
+        One page of course summaries, newest first, keyset-paginated on (created_at, id).
+        Module and lesson counts come from correlated subqueries in the same statement.
+        Returns (rows, cursor of the next page or None).
+        """
+        module_count = (
+            select(func.count(Module.id))
+            .filter(Module.course_id == Course.id)
+            .scalar_subquery()
+        )
+        lesson_count = (
+            select(func.count(Lesson.id))
+            .join(Module, Lesson.module_id == Module.id)
+            .filter(Module.course_id == Course.id)
+            .scalar_subquery()
+        )
+        query = select(
+            Course.id,
+            Course.title,
+            Course.description,
+            Course.is_published,
+            Course.instructor_id,
+            Course.created_at,
+            Course.updated_at,
+            module_count.label("module_count"),
+            lesson_count.label("lesson_count"),
+        )
+        if is_published is not None:
+            query = query.filter(Course.is_published == is_published)
+        if instructor_id is not None:
+            query = query.filter(Course.instructor_id == instructor_id)
+        if cursor is not None:
+            created_at, last_id = cursor
+            if db.bind.dialect.name == "sqlite":
+                # SQLite keeps server-default timestamps as text without fractional seconds
+                query = query.filter(
+                    tuple_(func.datetime(Course.created_at), Course.id)
+                    < tuple_(func.datetime(created_at), last_id)
+                )
+            else:
+                query = query.filter(tuple_(Course.created_at, Course.id) < tuple_(created_at, last_id))
+
+        result = await db.execute(
+            query.order_by(Course.created_at.desc(), Course.id.desc()).limit(limit + 1)
+        )
+        rows = [dict(row) for row in result.mappings().all()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = (rows[-1]["created_at"], rows[-1]["id"])
+        return rows, next_cursor
+
     async def create(self, db: AsyncSession, *, obj_in: CourseCreate, instructor_id: str) -> Course:
         db_obj = Course(
             title=obj_in.title,
@@ -38,6 +240,61 @@ class CRUDCourse:
         await db.refresh(db_obj)
         return db_obj
 
+    async def create_tree(self, db: AsyncSession, *, obj_in: CourseTreeCreate, instructor_id: str) -> int:
+        """
+        Insert a course with all its modules and lessons in a single transaction:
+        one INSERT for the course, one multi-row INSERT ... RETURNING for the modules
+        and one batched INSERT for the lessons. Returns the new course id.
+        """
+        try:
+            result = await db.execute(
+                insert(Course)
+                .values(
+                    title=obj_in.title,
+                    description=obj_in.description,
+                    is_published=obj_in.is_published,
+                    instructor_id=instructor_id,
+                )
+                .returning(Course.id)
+            )
+            course_id = result.scalar_one()
+
+            if obj_in.modules:
+                result = await db.execute(
+                    insert(Module).returning(Module.id, sort_by_parameter_order=True),
+                    [
+                        {
+                            "title": module_in.title,
+                            "description": module_in.description,
+                            "order": module_in.order,
+                            "course_id": course_id,
+                        }
+                        for module_in in obj_in.modules
+                    ],
+                )
+                module_ids = result.scalars().all()
+
+                lesson_rows = [
+                    {
+                        "title": lesson_in.title,
+                        "content": lesson_in.content,
+                        "video_url": lesson_in.video_url,
+                        "order": lesson_in.order,
+                        "module_id": module_id,
+                    }
+                    for module_id, module_in in zip(module_ids, obj_in.modules)
+                    for lesson_in in module_in.lessons
+                ]
+                if lesson_rows:
+                    await db.execute(insert(Lesson), lesson_rows)
+
+            await db.commit()
+        except Exception:
+            # Never leave a partially written course behind
+            await db.rollback()
+            raise
+        return course_id
+
     async def update(self, db: AsyncSession, *, db_obj: Course, obj_in: Union[CourseUpdate, Dict[str, Any]]) -> Course:
         if isinstance(obj_in, dict):
             update_data = obj_in
@@ -46,49 +303,38 @@ class CRUDCourse:
         for field in update_data:
             if hasattr(db_obj, field):
                 setattr(db_obj, field, update_data[field])
+        db_obj.version = Course.version + 1
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        await course_cache.invalidate(db_obj.id)
         return db_obj
 
     async def remove(self, db: AsyncSession, *, id: int) -> Optional[Course]:
         result = await db.execute(select(Course).filter(Course.id == id))
         obj = result.scalars().first()
         if obj:
+            await course_progress.remove_course(db, course_id=id)
             await db.delete(obj)
             await db.commit()
+            await course_cache.invalidate(id)
         return obj
 
     async def get_course_progress(self, db: AsyncSession, *, course_id: int, user_id: str) -> float:
         """
         Calculate progress percentage: (completed lessons / total lessons) * 100
         """
-        # Get total lessons
-        total_result = await db.execute(
-            select(func.count(Lesson.id))
-            .join(Module)
-            .filter(Module.course_id == course_id)
-        )
-        total_lessons = total_result.scalar() or 0
-        if total_lessons == 0:
-            return 0.0
-
-        # Get completed lessons
-        completed_result = await db.execute(
-            select(func.count(UserProgress.id))
-            .filter(
-                UserProgress.user_id == user_id,
-                UserProgress.is_completed == True,
-                UserProgress.lesson_id.in_(
-                    select(Lesson.id)
-                    .join(Module)
-                    .filter(Module.course_id == course_id)
-                )
-            )
-        )
-        completed_lessons = completed_result.scalar() or 0
-        
-        return (completed_lessons / total_lessons) * 100
+        progress = await self.get_courses_progress(db, course_ids=[course_id], user_id=user_id)
+        return progress[course_id]
+
+    async def get_courses_progress(
+        self, db: AsyncSession, *, course_ids: List[int], user_id: str
+    ) -> Dict[int, float]:
+        """
+        Progress percentage for many courses, read from the maintained
+        user_course_progress counters. Courses without lessons report 0.0.
+        """
+        return await course_progress.get_many(db, user_id=user_id, course_ids=course_ids)
 
 class CRUDModule:
     async def create(self, db: AsyncSession, *, obj_in: ModuleCreate, course_id: int) -> Module:
@@ -99,8 +345,10 @@ class CRUDModule:
             course_id=course_id
         )
         db.add(db_obj)
+        await bump_version(db, course_id)
         await db.commit()
         await db.refresh(db_obj)
+        await course_cache.invalidate(course_id)
         return db_obj
 
     async def get(self, db: AsyncSession, id: int) -> Optional[Module]:
@@ -117,14 +365,108 @@ class CRUDLesson:
             module_id=module_id
         )
         db.add(db_obj)
+        course_id = (
+            await db.execute(select(Module.course_id).filter(Module.id == module_id))
+        ).scalar_one()
+        await course_progress.adjust_total_lessons(db, course_id=course_id, delta=1)
+        await bump_version(db, course_id)
         await db.commit()
         await db.refresh(db_obj)
+        await course_cache.invalidate(course_id)
         return db_obj
 
     async def get(self, db: AsyncSession, id: int) -> Optional[Lesson]:
         result = await db.execute(select(Lesson).filter(Lesson.id == id))
         return result.scalars().first()
 
+    async def get_context_json(self, db: AsyncSession, id: int) -> Optional[bytes]:
+        """
+        Encoded lesson context, reused while the course version it was built from is
+        current (checked with one primary-key read of courses.version).
+        """
+        cached = await course_cache.get_lesson_context(id)
+        if cached is not None:
+            validators = await course.get_validators(db, id=cached.course_id)
+            if validators and validators["version"] == cached.version:
+                return cached.body
+
+        context = await self.get_context(db, id=id)
+        if context is None:
+            return None
+        body = lesson_context_adapter.dump_json(
+            lesson_context_adapter.validate_python(context, from_attributes=True)
+        )
+        await course_cache.set_lesson_context(
+            id, CachedLessonContext(context["course_id"], context["course_version"], body)
+        )
+        return body
+
+    async def get_context(self, db: AsyncSession, id: int) -> Optional[Dict[str, Any]]:
+        """
+        A lesson with its module, position and previous/next lessons across module
+        boundaries, in one query: window functions run over the lessons of the
+        lesson's course ordered by (module.order, lesson.order), then the row for
+        this lesson is joined back to its content, module and course version.
+        """
+        course_id = (
+            select(Module.course_id)
+            .join(Lesson, Lesson.module_id == Module.id)
+            .where(Lesson.id == id)
+            .scalar_subquery()
+        )
+        course_order = (Module.order, Module.id, Lesson.order, Lesson.id)
+        module_order = (Lesson.order, Lesson.id)
+        ordered = (
+            select(
+                Lesson.id.label("id"),
+                func.lag(Lesson.id).over(order_by=course_order).label("prev_id"),
+                func.lag(Lesson.title).over(order_by=course_order).label("prev_title"),
+                func.lag(Lesson.module_id).over(order_by=course_order).label("prev_module_id"),
+                func.lead(Lesson.id).over(order_by=course_order).label("next_id"),
+                func.lead(Lesson.title).over(order_by=course_order).label("next_title"),
+                func.lead(Lesson.module_id).over(order_by=course_order).label("next_module_id"),
+                func.row_number().over(order_by=course_order).label("position"),
+                func.count().over().label("total_lessons"),
+                func.row_number().over(partition_by=Lesson.module_id, order_by=module_order).label("module_position"),
+                func.count().over(partition_by=Lesson.module_id).label("module_lesson_count"),
+            )
+            .join(Module, Lesson.module_id == Module.id)
+            .where(Module.course_id == course_id)
+            .subquery()
+        )
+        result = await db.execute(
+            select(ordered, Lesson, Module.title, Module.order, Course.id, Course.title, Course.version)
+            .join(Lesson, Lesson.id == ordered.c.id)
+            .join(Module, Lesson.module_id == Module.id)
+            .join(Course, Module.course_id == Course.id)
+            .where(ordered.c.id == id)
+        )
+        row = result.first()
+        if row is None:
+            return None
+
+        m = row._mapping
+        lesson = m[Lesson]
+        return {
+            "course_id": m[Course.id],
+            "course_title": m[Course.title],
+            "course_version": m[Course.version],
+            "lesson": lesson,
+            "module": {"id": lesson.module_id, "title": m[Module.title], "order": m[Module.order] or 0},
+            "position": m["position"],
+            "total_lessons": m["total_lessons"],
+            "module_position": m["module_position"],
+            "module_lesson_count": m["module_lesson_count"],
+            "previous": (
+                {"id": m["prev_id"], "title": m["prev_title"], "module_id": m["prev_module_id"]}
+                if m["prev_id"] is not None else None
+            ),
+            "next": (
+                {"id": m["next_id"], "title": m["next_title"], "module_id": m["next_module_id"]}
+                if m["next_id"] is not None else None
+            ),
+        }
+
 course = CRUDCourse()
 module = CRUDModule()
 lesson = CRUDLesson()
@@ -0,0 +1,75 @@
+from typing import Collection, List, Optional, Tuple
+
+from sqlalchemy import and_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.upsert import insert
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.progress import UserCourseProgress
+
+class CRUDEnrollment:
+    async def upsert(self, db: AsyncSession, *, user_id: str, course_id: int) -> Optional[Enrollment]:
+        """
+        Enroll a user in one INSERT ... ON CONFLICT ... RETURNING statement.
+        An existing enrollment is returned unchanged (the conflict update is a no-op
+        so RETURNING still yields the row). Returns None when the course does not
+        exist: the foreign key replaces a separate existence check. Commits.
+        """
+        stmt = insert(db, Enrollment).values(user_id=user_id, course_id=course_id)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Enrollment.user_id, Enrollment.course_id],
+            set_={"user_id": stmt.excluded.user_id},
+        ).returning(Enrollment)
+
+        try:
+            result = await db.execute(stmt, execution_options={"populate_existing": True})
+            enrollment = result.scalars().one()
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            return None
+        return enrollment
+
+    async def create_many(self, db: AsyncSession, *, course_id: int, user_ids: Collection[str]) -> int:
+        """
+        Enroll many users with one multi-row INSERT ... ON CONFLICT DO NOTHING.
+        Commits and returns how many enrollments were actually created.
+        """
+        if not user_ids:
+            return 0
+        stmt = (
+            insert(db, Enrollment)
+            .values([{"user_id": user_id, "course_id": course_id} for user_id in user_ids])
+            .on_conflict_do_nothing(index_elements=[Enrollment.user_id, Enrollment.course_id])
+            .returning(Enrollment.id)
+        )
+        result = await db.execute(stmt)
+        created = len(result.all())
+        await db.commit()
+        return created
+
+    async def get_course_versions(self, db: AsyncSession, *, user_id: str) -> List[Tuple]:
+        """
+        (course_id, version, completed_count, total_lessons) per enrolled course:
+        everything the my-courses response depends on, without loading any tree.
+        """
+        result = await db.execute(
+            select(
+                Course.id,
+                Course.version,
+                UserCourseProgress.completed_count,
+                UserCourseProgress.total_lessons,
+            )
+            .join(Enrollment, Enrollment.course_id == Course.id)
+            .outerjoin(
+                UserCourseProgress,
+                and_(UserCourseProgress.course_id == Course.id, UserCourseProgress.user_id == user_id),
+            )
+            .where(Enrollment.user_id == user_id)
+            .order_by(Course.id)
+        )
+        return [tuple(row) for row in result.all()]
+
+enrollment = CRUDEnrollment()
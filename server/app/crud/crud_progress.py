@@ -0,0 +1,383 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, func, insert as sa_insert, literal, or_, select, union, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.db.upsert import insert
+from app.models.course import Lesson, Module
+from app.models.enrollment import Enrollment
+from app.models.progress import UserProgress, UserCourseProgress
+from app.schemas.progress import UserProgressBatchItem, UserProgressUpdate
+
+logger = logging.getLogger(__name__)
+
+# Rows per multi-row INSERT (keeps bind parameters well under PostgreSQL's limit)
+UPSERT_CHUNK_SIZE = 1000
+
+def progress_percent(completed_count: Optional[int], total_lessons: Optional[int]) -> float:
+    if not total_lessons:
+        return 0.0
+    return (min(completed_count or 0, total_lessons) / total_lessons) * 100
+
+class CRUDProgress:
+    async def upsert(
+        self, db: AsyncSession, *, user_id: str, lesson_id: int, obj_in: UserProgressUpdate
+    ) -> Optional[Tuple[UserProgress, bool]]:
+        """
+        Create or update the user's progress on a lesson.
+        Only the fields set on `obj_in` are changed on an existing row.
+        Returns (row, was_completed), or None when the lesson (or user) does not
+        exist. Does not commit, so counter updates can join the transaction.
+
+        The upsert leaves the completion flag alone (new rows start incomplete) and
+        locks the row until commit, so the flag it returns is the committed prior
+        state: a concurrent writer waits instead of reading the same old value.
+        Only a write that changes the flag issues a second statement to set it, so
+        of two concurrent first completions exactly one reports the flip.
+        The prior value can't come from the upsert's RETURNING itself: it only sees
+        the new row, and a snapshot subquery misses a row inserted concurrently.
+        """
+        changes = obj_in.model_dump(exclude_unset=True)
+        completed = changes.pop("is_completed", None)
+        values = {**obj_in.model_dump(), "is_completed": False}
+        stmt = insert(db, UserProgress).values(user_id=user_id, lesson_id=lesson_id, **values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserProgress.user_id, UserProgress.lesson_id],
+            set_={**changes, "last_accessed": func.now()},
+        ).returning(UserProgress)
+
+        try:
+            row = (
+                await db.execute(stmt, execution_options={"populate_existing": True})
+            ).scalar_one()
+        except IntegrityError:
+            await db.rollback()
+            return None
+
+        was_completed = bool(row.is_completed)
+        if completed is None or completed == was_completed:
+            return row, was_completed
+
+        row = (
+            await db.execute(
+                update(UserProgress)
+                .where(UserProgress.user_id == user_id, UserProgress.lesson_id == lesson_id)
+                .values(is_completed=completed)
+                .returning(UserProgress),
+                execution_options={"populate_existing": True},
+            )
+        ).scalar_one()
+        return row, was_completed
+
+    async def get_course_lessons(self, db: AsyncSession, *, user_id: str, course_id: int) -> List[Any]:
+        """
+        Progress for every lesson in a course in one join of lessons, modules and
+        user_progress (indexed on module_id, course_id and (user_id, lesson_id)).
+        Rows are (lesson_id, is_completed, video_progress, last_accessed), with
+        NULLs for lessons the user hasn't touched, in outline order.
+        """
+        result = await db.execute(
+            select(
+                Lesson.id,
+                UserProgress.is_completed,
+                UserProgress.video_progress,
+                UserProgress.last_accessed,
+            )
+            .join(Module, Lesson.module_id == Module.id)
+            .outerjoin(
+                UserProgress,
+                and_(UserProgress.lesson_id == Lesson.id, UserProgress.user_id == user_id),
+            )
+            .where(Module.course_id == course_id)
+            .order_by(Module.order, Lesson.order, Lesson.id)
+        )
+        return list(result.all())
+
+    async def apply_batch(
+        self, db: AsyncSession, *, user_id: str, items: List[UserProgressBatchItem]
+    ) -> List[UserProgress]:
+        """
+        Apply offline/replayed progress updates with last-writer-wins on `last_accessed`.
+        Items are merged per lesson in timestamp order, client timestamps are
+        clamped to now, and unknown lessons are skipped. Each distinct set of
+        updated fields is one multi-row upsert (normally there is only one).
+        Counter deltas are applied for completion flips. Commits and returns the
+        merged rows for every known lesson in the batch.
+        """
+        now = datetime.now(timezone.utc)
+        stamped = []
+        for item in items:
+            timestamp = item.client_timestamp or now
+            if timestamp.tzinfo is None:
+                timestamp = timestamp.replace(tzinfo=timezone.utc)
+            stamped.append((min(timestamp.astimezone(timezone.utc), now), item))
+
+        # Fold items per lesson in time order: each field keeps its latest value
+        latest: Dict[int, Tuple[datetime, Dict[str, Any]]] = {}
+        for timestamp, item in sorted(stamped, key=lambda pair: pair[0]):
+            changes = latest.get(item.lesson_id, (timestamp, {}))[1]
+            changes.update(item.model_dump(exclude_unset=True, include=set(UserProgressUpdate.model_fields)))
+            latest[item.lesson_id] = (timestamp, changes)
+        if not latest:
+            return []
+
+        course_of = dict((await db.execute(
+            select(Lesson.id, Module.course_id)
+            .join(Module, Lesson.module_id == Module.id)
+            .where(Lesson.id.in_(latest))
+        )).all())
+        known = sorted(course_of)
+        unknown = set(latest) - set(known)
+        if unknown:
+            logger.warning(f"Skipping progress for unknown lessons {sorted(unknown)} (user {user_id})")
+        if not known:
+            return []
+
+        # Create missing rows (incomplete, never accessed) so every row can be locked
+        # before its previous completion state is read; a concurrent writer then
+        # waits instead of computing its counter delta from the same old state.
+        for start in range(0, len(known), UPSERT_CHUNK_SIZE):
+            await db.execute(
+                insert(db, UserProgress)
+                .values([
+                    {"user_id": user_id, "lesson_id": lesson_id, "is_completed": False,
+                     "video_progress": 0.0, "last_accessed": None}
+                    for lesson_id in known[start:start + UPSERT_CHUNK_SIZE]
+                ])
+                .on_conflict_do_nothing(index_elements=[UserProgress.user_id, UserProgress.lesson_id])
+            )
+        result = await db.execute(
+            select(UserProgress.lesson_id, UserProgress.is_completed)
+            .where(UserProgress.user_id == user_id, UserProgress.lesson_id.in_(known))
+            .order_by(UserProgress.lesson_id)
+            .with_for_update()
+        )
+        was_completed = {lesson_id: bool(is_completed) for lesson_id, is_completed in result.all()}
+
+        groups: Dict[frozenset, List[Dict[str, Any]]] = {}
+        for lesson_id, (timestamp, changes) in latest.items():
+            if lesson_id in unknown:
+                continue
+            groups.setdefault(frozenset(changes), []).append({
+                "user_id": user_id,
+                "lesson_id": lesson_id,
+                "last_accessed": timestamp,
+                **UserProgressUpdate(**changes).model_dump(),
+            })
+
+        for fields, rows in groups.items():
+            for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+                stmt = insert(db, UserProgress).values(rows[start:start + UPSERT_CHUNK_SIZE])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[UserProgress.user_id, UserProgress.lesson_id],
+                    set_={
+                        **{field: getattr(stmt.excluded, field) for field in fields},
+                        "last_accessed": stmt.excluded.last_accessed,
+                    },
+                    # Older writes lose to whatever is already stored
+                    where=or_(
+                        UserProgress.last_accessed.is_(None),
+                        UserProgress.last_accessed <= stmt.excluded.last_accessed,
+                    ),
+                )
+                await db.execute(stmt)
+
+        result = await db.execute(
+            select(UserProgress)
+            .where(UserProgress.user_id == user_id, UserProgress.lesson_id.in_(was_completed))
+            .execution_options(populate_existing=True)
+        )
+        merged = list(result.scalars().all())
+
+        # Net flips per course, so the counters take one statement per course, not per lesson
+        deltas: Dict[int, Tuple[int, int]] = {}
+        for row in merged:
+            if bool(row.is_completed) != was_completed[row.lesson_id]:
+                course_id = course_of[row.lesson_id]
+                lesson_id, delta = deltas.get(course_id, (row.lesson_id, 0))
+                deltas[course_id] = (lesson_id, delta + (1 if row.is_completed else -1))
+        for lesson_id, delta in deltas.values():
+            if delta:
+                await course_progress.apply_completion_delta(db, user_id=user_id, lesson_id=lesson_id, delta=delta)
+
+        await db.commit()
+        return merged
+
+    async def bulk_upsert_video_progress(self, db: AsyncSession, *, rows: List[Dict[str, Any]]) -> int:
+        """
+        Write many {user_id, lesson_id, video_progress} rows with multi-row
+        INSERT ... ON CONFLICT DO UPDATE. Only `video_progress` and `last_accessed`
+        are touched on existing rows, so completion state is never overwritten.
+        A chunk that violates a foreign key is retried row by row and the bad rows
+        are skipped. Commits and returns the number of rows written.
+        """
+        written = 0
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            chunk = rows[start:start + UPSERT_CHUNK_SIZE]
+            try:
+                await db.execute(self._video_progress_upsert(db, chunk))
+                await db.commit()
+                written += len(chunk)
+            except IntegrityError:
+                await db.rollback()
+                for row in chunk:
+                    try:
+                        await db.execute(self._video_progress_upsert(db, [row]))
+                        await db.commit()
+                        written += 1
+                    except IntegrityError:
+                        await db.rollback()
+                        logger.warning(
+                            f"Dropping progress for unknown user/lesson: {row['user_id']}/{row['lesson_id']}"
+                        )
+        return written
+
+    def _video_progress_upsert(self, db: AsyncSession, rows: List[Dict[str, Any]]):
+        stmt = insert(db, UserProgress).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=[UserProgress.user_id, UserProgress.lesson_id],
+            set_={
+                "video_progress": stmt.excluded.video_progress,
+                "last_accessed": func.now(),
+            },
+        )
+
+class CRUDCourseProgress:
+    """
+    Maintains `user_course_progress` counters. Methods never commit: they run
+    inside the caller's transaction so counters change atomically with the write.
+    """
+
+    async def apply_completion_delta(
+        self, db: AsyncSession, *, user_id: str, lesson_id: int, delta: int
+    ) -> None:
+        """
+        Add `delta` (e.g. +1/-1, or a batch's net change) to the completed count of
+        the lesson's course, creating the counter row (with the course's lesson
+        total) if needed.
+        """
+        course_lesson = aliased(Lesson)
+        course_module = aliased(Module)
+        total_lessons = (
+            select(func.count(course_lesson.id))
+            .join(course_module, course_lesson.module_id == course_module.id)
+            .where(course_module.course_id == Module.course_id)
+            .scalar_subquery()
+        )
+        source = (
+            select(
+                literal(user_id),
+                Module.course_id,
+                literal(max(delta, 0)),
+                total_lessons,
+                func.now(),
+            )
+            .select_from(Lesson)
+            .join(Module, Lesson.module_id == Module.id)
+            .where(Lesson.id == lesson_id)
+        )
+        stmt = insert(db, UserCourseProgress).from_select(
+            ["user_id", "course_id", "completed_count", "total_lessons", "last_activity"],
+            source,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserCourseProgress.user_id, UserCourseProgress.course_id],
+            set_={
+                "completed_count": UserCourseProgress.completed_count + delta,
+                "last_activity": func.now(),
+            },
+        )
+        await db.execute(stmt)
+
+    async def adjust_total_lessons(self, db: AsyncSession, *, course_id: int, delta: int) -> None:
+        await db.execute(
+            update(UserCourseProgress)
+            .where(UserCourseProgress.course_id == course_id)
+            .values(total_lessons=UserCourseProgress.total_lessons + delta)
+        )
+
+    async def remove_course(self, db: AsyncSession, *, course_id: int) -> None:
+        await db.execute(delete(UserCourseProgress).where(UserCourseProgress.course_id == course_id))
+
+    async def get_many(
+        self, db: AsyncSession, *, user_id: str, course_ids: List[int]
+    ) -> Dict[int, float]:
+        """
+        Progress percentage per course from the counters (single indexed lookup).
+        Courses without a counter row report 0.0.
+        """
+        progress = {course_id: 0.0 for course_id in course_ids}
+        if not course_ids:
+            return progress
+
+        result = await db.execute(
+            select(
+                UserCourseProgress.course_id,
+                UserCourseProgress.completed_count,
+                UserCourseProgress.total_lessons,
+            ).where(
+                UserCourseProgress.user_id == user_id,
+                UserCourseProgress.course_id.in_(course_ids),
+            )
+        )
+        for course_id, completed_count, total_lessons in result.all():
+            progress[course_id] = progress_percent(completed_count, total_lessons)
+        return progress
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """
+        Recompute every counter row from enrollments and user_progress.
+        Rows are written for every enrolled user and every user with progress in a course.
+        """
+        totals = (
+            select(Module.course_id, func.count(Lesson.id).label("total_lessons"))
+            .join(Lesson, Lesson.module_id == Module.id)
+            .group_by(Module.course_id)
+            .subquery()
+        )
+        done = (
+            select(
+                UserProgress.user_id,
+                Module.course_id,
+                func.sum(case((UserProgress.is_completed == True, 1), else_=0)).label("completed_count"),
+                func.max(UserProgress.last_accessed).label("last_activity"),
+            )
+            .join(Lesson, UserProgress.lesson_id == Lesson.id)
+            .join(Module, Lesson.module_id == Module.id)
+            .group_by(UserProgress.user_id, Module.course_id)
+            .subquery()
+        )
+        pairs = union(
+            select(Enrollment.user_id, Enrollment.course_id),
+            select(done.c.user_id, done.c.course_id),
+        ).subquery()
+
+        source = (
+            select(
+                pairs.c.user_id,
+                pairs.c.course_id,
+                func.coalesce(done.c.completed_count, 0),
+                func.coalesce(totals.c.total_lessons, 0),
+                func.coalesce(done.c.last_activity, func.now()),
+            )
+            .select_from(pairs)
+            .outerjoin(done, and_(done.c.user_id == pairs.c.user_id, done.c.course_id == pairs.c.course_id))
+            .outerjoin(totals, totals.c.course_id == pairs.c.course_id)
+        )
+
+        await db.execute(delete(UserCourseProgress))
+        result = await db.execute(
+            sa_insert(UserCourseProgress).from_select(
+                ["user_id", "course_id", "completed_count", "total_lessons", "last_activity"],
+                source,
+            )
+        )
+        await db.commit()
+        return result.rowcount
+
+course_progress = CRUDCourseProgress()
+progress = CRUDProgress()
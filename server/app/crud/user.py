@@ -1,11 +1,38 @@
-from typing import Any, Dict, Optional, Union, List
+from typing import Any, Collection, Dict, Optional, Tuple, Union, List
 
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_
 from sqlalchemy.future import select
 
+from app.core.cache import TTLCache, get_shared_cache
+from app.core.config import settings
+from app.db.upsert import insert
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
+# UIDs known to have a row in `users`; lets /users/me skip provisioning entirely
+known_users = TTLCache(maxsize=settings.KNOWN_USERS_CACHE_SIZE)
+
+def _known_user_key(uid: str) -> str:
+    return f"user:known:{uid}"
+
+async def is_known(uid: str) -> bool:
+    if uid in known_users:
+        return True
+    shared = get_shared_cache()
+    if shared and await shared.get(_known_user_key(uid)):
+        known_users.set(uid, True)
+        return True
+    return False
+
+async def mark_known(uid: str) -> None:
+    if uid in known_users:
+        return
+    known_users.set(uid, True)
+    shared = get_shared_cache()
+    if shared:
+        await shared.set(_known_user_key(uid), "1")
+
 async def get(db: AsyncSession, id: str) -> Optional[User]:
     return await db.get(User, id)
 
@@ -13,6 +40,31 @@ async def get_by_email(db: AsyncSession, email: str) -> Optional[User]:
     result = await db.execute(select(User).filter(User.email == email))
     return result.scalars().first()
 
+async def resolve(
+    db: AsyncSession, *, ids: Collection[str], emails: Collection[str]
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Look up many users by id and/or email in one query.
+    Returns ({id: id}, {email: id}) for the ones that exist.
+    """
+    if not ids and not emails:
+        return {}, {}
+    conditions = []
+    if ids:
+        conditions.append(User.id.in_(list(ids)))
+    if emails:
+        conditions.append(User.email.in_(list(emails)))
+    result = await db.execute(select(User.id, User.email).where(or_(*conditions)))
+
+    by_id: Dict[str, str] = {}
+    by_email: Dict[str, str] = {}
+    for user_id, email in result.all():
+        if user_id in ids:
+            by_id[user_id] = user_id
+        if email in emails:
+            by_email[email] = user_id
+    return by_id, by_email
+
 async def create(db: AsyncSession, *, obj_in: UserCreate) -> User:
     db_obj = User(
         id=obj_in.id,
@@ -25,6 +77,28 @@ async def create(db: AsyncSession, *, obj_in: UserCreate) -> User:
     await db.refresh(db_obj)
     return db_obj
 
+async def ensure(db: AsyncSession, *, obj_in: UserCreate) -> Optional[User]:
+    """
+    Insert the user unless a row with the same id or email already exists.
+    Single INSERT ... ON CONFLICT DO NOTHING RETURNING, so concurrent first logins cannot race.
+    Returns the new row, or None if nothing was inserted.
+    """
+    stmt = (
+        insert(db, User)
+        .values(
+            id=obj_in.id,
+            email=obj_in.email,
+            full_name=obj_in.full_name,
+            is_active=obj_in.is_active,
+        )
+        .on_conflict_do_nothing()
+        .returning(User)
+    )
+    result = await db.execute(stmt)
+    db_obj = result.scalars().first()
+    await db.commit()
+    return db_obj
+
 async def update(
     db: AsyncSession, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
 ) -> User:
@@ -1,5 +1,6 @@
 from app.db.base_class import Base
 from app.models.user import User
 from app.models.course import Course, Module, Lesson
-from app.models.progress import UserProgress
+from app.models.progress import UserProgress, UserCourseProgress
 from app.models.enrollment import Enrollment
+from app.models.ai_cache import AIResponseCache
@@ -0,0 +1,196 @@
+import contextvars
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+# Expanded IN lists / multi-row VALUES differ only in their number of placeholders
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|\$\d+|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|\$\d+|%\(\w+\)s|:\w+)\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement so repeated queries with different literals compare equal."""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER_LIST.sub("(...)", shape)
+    return _NUMBER.sub("N", shape)
+
+class QueryStats:
+    """Queries issued (and time spent in SQL) within one request or block."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.duration += elapsed
+        self.shapes[statement_shape(statement)] += 1
+
+    def merge(self, other: "QueryStats") -> None:
+        self.count += other.count
+        self.duration += other.duration
+        self.shapes.update(other.shapes)
+
+    def repeated_shapes(self, threshold: int) -> Dict[str, int]:
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+_current_stats: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar(
+    "sql_query_stats", default=None
+)
+
+# --- SQLAlchemy event hooks ---
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    starts = conn.info.get("query_start_time")
+    if stats is not None and starts:
+        stats.record(statement, time.perf_counter() - starts.pop())
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Count and time every statement executed on `engine` for the active request."""
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+# --- Per-route aggregates ---
+
+route_stats: Dict[str, Dict[str, Any]] = {}
+
+def _record_route(route_key: str, stats: QueryStats, suspected_n_plus_one: bool) -> None:
+    agg = route_stats.get(route_key)
+    if agg is None:
+        agg = route_stats[route_key] = {
+            "requests": 0,
+            "queries": 0,
+            "max_queries": 0,
+            "sql_time_ms": 0.0,
+            "n_plus_one_suspects": 0,
+        }
+    agg["requests"] += 1
+    agg["queries"] += stats.count
+    agg["max_queries"] = max(agg["max_queries"], stats.count)
+    agg["sql_time_ms"] += stats.duration * 1000
+    if suspected_n_plus_one:
+        agg["n_plus_one_suspects"] += 1
+
+def get_route_stats() -> Dict[str, Dict[str, Any]]:
+    return {
+        route_key: {
+            **agg,
+            "sql_time_ms": round(agg["sql_time_ms"], 2),
+            "avg_queries": round(agg["queries"] / agg["requests"], 2),
+        }
+        for route_key, agg in route_stats.items()
+    }
+
+def _route_template(scope: Scope) -> str:
+    """
+    Full templated path of the matched route, e.g. /api/v1/courses/{id}.
+    Included routers may report their path without the prefix, so the
+    template replaces the trailing segments of the concrete path.
+    """
+    route = scope.get("route")
+    path = scope["path"]
+    if route is None or not getattr(route, "path", None):
+        return path
+    template = route.path.split("/")
+    concrete = path.split("/")
+    if len(concrete) < len(template):
+        return route.path
+    return "/".join(concrete[: len(concrete) - len(template) + 1] + template[1:])
+
+class SQLInstrumentationMiddleware:
+    """
+    Counts queries and SQL time per request, reports them in a `Server-Timing` header,
+    aggregates them per route and logs repeated statement shapes as suspected N+1s.
+    """
+
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = 5):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        parent = _current_stats.get()
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - started) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries", app;dur={total_ms:.2f}',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            if parent is not None:
+                parent.merge(stats)
+            self._finish(scope, stats)
+
+    def _finish(self, scope: Scope, stats: QueryStats) -> None:
+        route_key = f"{scope['method']} {_route_template(scope)}"
+
+        repeated = stats.repeated_shapes(self.n_plus_one_threshold)
+        for shape, n in repeated.items():
+            logger.warning(f"Suspected N+1 on {route_key}: {n} x {shape[:300]}")
+        _record_route(route_key, stats, bool(repeated))
+
+# --- Test helpers ---
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    """
+    Fail if the block issues more than `limit` queries. Covers requests made
+    in the same task, e.g. through httpx.AsyncClient(transport=ASGITransport(app)).
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+    if stats.count > limit:
+        details = "\n".join(f"  {n} x {shape}" for shape, n in stats.shapes.most_common())
+        raise AssertionError(f"Expected at most {limit} queries, got {stats.count}:\n{details}")
+
+_SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+def assert_response_queries(response: Any, limit: int) -> int:
+    """
+    Fail if a response's `Server-Timing` header reports more than `limit` queries.
+    Works with any client (TestClient included). Returns the reported count.
+    """
+    match = _SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+    if not match:
+        raise AssertionError("Response has no db Server-Timing entry; is SQL instrumentation enabled?")
+    count = int(match.group(1))
+    if count > limit:
+        raise AssertionError(f"Expected at most {limit} queries, got {count}")
+    return count
@@ -1,16 +1,109 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db.instrumentation import instrument_engine
+
+# Named engine profiles; individual DB_* settings override the selected profile
+ENGINE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "dev": {
+        "echo": True,
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": False,
+        "statement_timeout_ms": None,
+    },
+    "prod": {
+        "echo": False,
+        "pool_size": 20,
+        "max_overflow": 10,
+        "pool_timeout": 10,
+        # Recycle before the pooler/load balancer drops idle connections
+        "pool_recycle": 300,
+        "pool_pre_ping": True,
+        "statement_timeout_ms": 15000,
+    },
+}
+
+def get_engine_profile(name: str) -> Dict[str, Any]:
+    if name not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DB_ENGINE_PROFILE '{name}', expected one of {list(ENGINE_PROFILES)}")
+    profile = dict(ENGINE_PROFILES[name])
+    overrides = {
+        "echo": settings.DB_ECHO,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "statement_timeout_ms": settings.DB_STATEMENT_TIMEOUT_MS,
+    }
+    profile.update({key: value for key, value in overrides.items() if value is not None})
+    return profile
+
+def build_engine(url: str, profile_name: Optional[str] = None) -> AsyncEngine:
+    """
+    Create an async engine for `url` using the named profile.
+    Works for asyncpg (production, behind a pooler) and aiosqlite (local/tests).
+    """
+    profile = get_engine_profile(profile_name or settings.DB_ENGINE_PROFILE)
+    kwargs: Dict[str, Any] = {
+        "future": True,
+        "echo": profile["echo"],
+        "pool_pre_ping": profile["pool_pre_ping"],
+    }
+
+    db_url = make_url(url)
+    backend = db_url.get_backend_name()
+    if backend == "postgresql":
+        # Prepared statement cache must stay off behind PgBouncer/Supavisor
+        connect_args: Dict[str, Any] = {"statement_cache_size": 0}
+        if profile["statement_timeout_ms"]:
+            # Client-side timeout: server startup parameters are rejected by transaction poolers
+            connect_args["command_timeout"] = profile["statement_timeout_ms"] / 1000
+        kwargs["connect_args"] = connect_args
+
+    if backend != "sqlite" or db_url.database not in (None, "", ":memory:"):
+        kwargs.update(
+            pool_size=profile["pool_size"],
+            max_overflow=profile["max_overflow"],
+            pool_timeout=profile["pool_timeout"],
+            pool_recycle=profile["pool_recycle"],
+        )
 
-engine = create_async_engine(
-    settings.SUPABASE_URL,
-    future=True,
-    echo=True,
-    connect_args={"statement_cache_size": 0},
-)
+    async_engine = create_async_engine(url, **kwargs)
+    if backend == "sqlite":
+        # Upserts rely on foreign keys to reject unknown courses/lessons
+        event.listen(async_engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+    return async_engine
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+engine = build_engine(settings.SUPABASE_URL)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Read replica for read-heavy GET endpoints; falls back to the primary when not configured
+read_engine = build_engine(settings.SUPABASE_READ_URL) if settings.SUPABASE_READ_URL else engine
+ReadSessionLocal = sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    instrument_engine(engine)
+    instrument_engine(read_engine)
+
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+async def get_read_db():
+    """
+    Session on the read replica. Only for endpoints that tolerate replication lag.
+    """
+    async with ReadSessionLocal() as session:
+        yield session
@@ -0,0 +1,14 @@
+from typing import Any
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def insert(db: AsyncSession, model: Any):
+    """
+    Dialect-specific INSERT with ON CONFLICT support.
+    PostgreSQL in production, SQLite for local and test databases.
+    """
+    if db.bind.dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
@@ -1,14 +1,36 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
 
 from app.core.config import settings
+from app.core import security
+from app.db.instrumentation import SQLInstrumentationMiddleware
+from app.db.session import engine
+from app.services.ai.registry import ai_registry
+from app.services.progress_buffer import progress_buffer
+from app.services.search.factory import setup_search
 from app.api.v1.api import api_router
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await setup_search(engine)
+    if security.token_verifier is not None:
+        await security.token_verifier.start()
+    if settings.PROGRESS_BUFFER_ENABLED:
+        await progress_buffer.start()
+    yield
+    if settings.PROGRESS_BUFFER_ENABLED:
+        await progress_buffer.stop()
+    if security.token_verifier is not None:
+        await security.token_verifier.stop()
+    await ai_registry.close()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
@@ -21,6 +43,12 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    app.add_middleware(
+        SQLInstrumentationMiddleware,
+        n_plus_one_threshold=settings.SQL_N_PLUS_ONE_THRESHOLD,
+    )
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 if os.path.exists("uploads"):
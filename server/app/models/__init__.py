@@ -1,10 +1,12 @@
 from .user import User
 from .course import Course, Module, Lesson
 from .enrollment import Enrollment
-from .progress import UserProgress
+from .progress import UserProgress, UserCourseProgress
+from .ai_cache import AIResponseCache
 
 # Export submodules as well to support models.course.Course style access
 from . import user
 from . import course
 from . import enrollment
 from . import progress
+from . import ai_cache
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Float, Text, DateTime
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class AIResponseCache(Base):
+    """
+    Shared store for exact-match LLM responses (app/services/ai/response_cache.py).
+    `key` is a SHA-256 of the model, prompts, schema and call parameters.
+    """
+    __tablename__ = "ai_response_cache"
+
+    key = Column(String(64), primary_key=True)
+    model = Column(String, nullable=False)
+    value = Column(Text, nullable=False)
+    latency_ms = Column(Float, nullable=False, default=0.0) # cost of the original call
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
@@ -13,16 +13,25 @@ class Course(Base):
     is_published = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped on every course, module or lesson write; used as the HTTP validator
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     modules = relationship("Module", back_populates="course", cascade="all, delete-orphan")
 
+    # Keyset pagination of the catalog on (created_at, id), optionally filtered
+    __table_args__ = (
+        Index("ix_courses_created_at_id", "created_at", "id"),
+        Index("ix_courses_published_created_at_id", "is_published", "created_at", "id"),
+        Index("ix_courses_instructor_created_at_id", "instructor_id", "created_at", "id"),
+    )
+
 class Module(Base):
     __tablename__ = "modules"
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True, nullable=False)
     description = Column(Text, nullable=True)
-    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False, index=True)
     order = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -36,7 +45,7 @@ class Lesson(Base):
     title = Column(String, index=True, nullable=False)
     content = Column(Text, nullable=True) # Markdown content
     video_url = Column(String, nullable=True)
-    module_id = Column(Integer, ForeignKey("modules.id"), nullable=False)
+    module_id = Column(Integer, ForeignKey("modules.id"), nullable=False, index=True)
     order = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -17,3 +17,19 @@ class UserProgress(Base):
     lesson = relationship("Lesson")
 
     __table_args__ = (UniqueConstraint('user_id', 'lesson_id', name='_user_lesson_uc'),)
+
+class UserCourseProgress(Base):
+    """
+    Denormalized per-user course counters, maintained on every completion flip
+    and lesson add/remove. Rebuild with scripts/rebuild_course_progress.py.
+    """
+    __tablename__ = "user_course_progress"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False, index=True)
+    completed_count = Column(Integer, nullable=False, default=0)
+    total_lessons = Column(Integer, nullable=False, default=0)
+    last_activity = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (UniqueConstraint('user_id', 'course_id', name='_user_course_progress_uc'),)
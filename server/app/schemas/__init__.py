@@ -2,8 +2,16 @@ from .user import User, UserCreate, UserUpdate
 from .course import (
     Course, CourseCreate, CourseUpdate,
     Module, ModuleCreate, ModuleUpdate,
-    Lesson, LessonCreate, LessonUpdate
+    Lesson, LessonCreate, LessonUpdate,
+    CourseSummary, CourseCatalogPage,
+    CourseTreeCreate, ModuleTreeCreate,
+    CourseOutline, ModuleOutline, LessonOutline,
+    LessonContext, LessonContextModule, LessonRef
 )
-from .progress import UserProgress, UserProgressCreate, UserProgressUpdate
-from .enrollment import EnrollmentResponse, EnrollmentCreate
-from .ai import ChatRequest, ChatResponse, QuizGenerateRequest, QuizResponse, CodeExplainRequest, CodeExplainResponse
+from .progress import UserProgress, UserProgressCreate, UserProgressUpdate, UserProgressBatchItem, UserProgressHeartbeat
+from .enrollment import EnrollmentResponse, EnrollmentCreate, EnrollmentBulkResult
+from .ai import (
+    ChatRequest, ChatResponse, QuizGenerateRequest, QuizResponse, CodeExplainRequest, CodeExplainResponse,
+    CourseGenerateRequest, CourseGenerateResponse
+)
+from .search import SearchHit, SearchPage
@@ -24,6 +24,18 @@ class Lesson(LessonBase):
     class Config:
         from_attributes = True
 
+class LessonOutline(BaseModel):
+    """Lesson without its Markdown content, for course outlines."""
+    id: int
+    module_id: int
+    title: str
+    video_url: Optional[str] = None
+    order: int = 0
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
 # --- Module ---
 class ModuleBase(BaseModel):
     title: str
@@ -46,6 +58,15 @@ class Module(ModuleBase):
     class Config:
         from_attributes = True
 
+class ModuleOutline(ModuleBase):
+    id: int
+    course_id: int
+    created_at: datetime
+    lessons: List[LessonOutline] = []
+
+    class Config:
+        from_attributes = True
+
 # --- Course ---
 class CourseBase(BaseModel):
     title: str
@@ -63,7 +84,67 @@ class Course(CourseBase):
     instructor_id: str
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version: int = 1
     modules: List[Module] = []
 
     class Config:
         from_attributes = True
+
+class CourseOutline(CourseBase):
+    """Course tree with lesson titles and order only; content is fetched per lesson."""
+    id: int
+    instructor_id: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    version: int = 1
+    modules: List[ModuleOutline] = []
+
+    class Config:
+        from_attributes = True
+
+# --- Lesson navigation ---
+class LessonRef(BaseModel):
+    id: int
+    title: str
+    module_id: int
+
+class LessonContextModule(BaseModel):
+    id: int
+    title: str
+    order: int = 0
+
+class LessonContext(BaseModel):
+    course_id: int
+    course_title: str
+    course_version: int
+    lesson: Lesson
+    module: LessonContextModule
+    position: int # 1-based, across the whole course
+    total_lessons: int
+    module_position: int # 1-based, within the module
+    module_lesson_count: int
+    previous: Optional[LessonRef] = None
+    next: Optional[LessonRef] = None
+
+# --- Course tree import ---
+class ModuleTreeCreate(ModuleCreate):
+    lessons: List[LessonCreate] = []
+
+class CourseTreeCreate(CourseCreate):
+    modules: List[ModuleTreeCreate] = []
+
+# --- Catalog ---
+class CourseSummary(CourseBase):
+    id: int
+    instructor_id: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    module_count: int = 0
+    lesson_count: int = 0
+
+    class Config:
+        from_attributes = True
+
+class CourseCatalogPage(BaseModel):
+    items: List[CourseSummary]
+    next_cursor: Optional[str] = None
@@ -1,7 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
-from .course import Course
+from .course import CourseOutline
 
 class EnrollmentBase(BaseModel):
     course_id: int
@@ -18,5 +18,11 @@ class EnrollmentResponse(EnrollmentBase):
     class Config:
         from_attributes = True
 
-class CourseWithProgress(Course):
+class EnrollmentBulkResult(BaseModel):
+    created: int
+    existing: int
+    invalid: int
+    invalid_samples: List[str] = []
+
+class CourseWithProgress(CourseOutline):
     progress: float = 0.0
@@ -12,10 +12,20 @@ class UserProgressCreate(UserProgressBase):
 class UserProgressUpdate(UserProgressBase):
     pass
 
+class UserProgressBatchItem(UserProgressUpdate):
+    lesson_id: int
+    client_timestamp: Optional[datetime] = None # when the change happened on the client
+
+class UserProgressHeartbeat(BaseModel):
+    """A buffered video position (202 Accepted); not yet written, so no completion state."""
+    user_id: str
+    lesson_id: int
+    video_progress: float
+
 class UserProgress(UserProgressBase):
     user_id: str
     lesson_id: int
-    last_accessed: datetime
+    last_accessed: Optional[datetime] = None
 
     class Config:
         from_attributes = True
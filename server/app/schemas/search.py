@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+
+class SearchHit(BaseModel):
+    kind: Literal["course", "lesson"]
+    id: int
+    course_id: int
+    title: str
+    snippet: str # matches wrapped in <mark>...</mark>
+    rank: float
+
+class SearchPage(BaseModel):
+    query: str
+    items: List[SearchHit]
+    limit: int
+    offset: int
+    next_offset: Optional[int] = None
@@ -1,29 +1,60 @@
 from typing import List, Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.ai.base_provider import LLMProvider
 from app.services.ai.factory import get_ai_provider, TaskType
 from app.services.ai.ingestion import ContentIngestor
+from app.services.ai.registry import ProviderRegistry
+from app.services.ai.semantic_cache import semantic_cache
+from app.core.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
 class AIService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, registry: Optional[ProviderRegistry] = None):
         self.db = db
-        self.ai = get_ai_provider()
-        self.ingestor = ContentIngestor(db)
+        self.registry = registry
+        self.ingestor = ContentIngestor(db, registry=registry)
+
+    def llm(self, task: TaskType) -> LLMProvider:
+        """Provider routed to the model configured for `task`."""
+        return get_ai_provider(task, registry=self.registry)
 
 class AITutorService(AIService):
     async def chat(self, user_id: str, course_id: int, message: str, history: List[Dict[str, str]] = None) -> str:
         """
         Agentic Tutor with multi-turn reasoning and RAG.
         """
+        from sqlalchemy.future import select
+        from app import models
+
+        # 0. First-turn questions may already have been answered for this version of the course in other words
+        question_embedding = None
+        course_version = None
+        use_semantic_cache = settings.AI_SEMANTIC_CACHE_ENABLED and not history
+        if use_semantic_cache:
+            course_version = (await self.db.execute(
+                select(models.course.Course.version).filter(models.course.Course.id == course_id)
+            )).scalar_one_or_none()
+            use_semantic_cache = course_version is not None
+        if use_semantic_cache:
+            question_embedding = await self.ingestor.embed_query(message)
+            cached_answer = semantic_cache.lookup(course_id, course_version, question_embedding)
+            if cached_answer is not None:
+                return cached_answer
+
         # 1. Search for context (including potential query expansion)
         search_query = message
         if len(message) < 10: # Short queries benefit from expansion
             expansion_prompt = f"Expand this student question into a search query for educational materials: {message}"
-            search_query = await self.ai.generate_text(expansion_prompt, max_tokens=50)
+            search_query = await self.llm(TaskType.EXPANSION).generate_text(expansion_prompt)
 
-        search_results = await self.ingestor.search_course_content(search_query, course_id=course_id, top_k=5)
+        search_results = await self.ingestor.search_course_content(
+            search_query,
+            course_id=course_id,
+            top_k=5,
+            embedding=question_embedding if search_query == message else None,
+        )
         
         context_parts = []
         if search_results and search_results.get('matches'):
@@ -62,7 +93,10 @@ class AITutorService(AIService):
         for m in messages:
             full_conversation += f"{m['role'].capitalize()}: {m['content']}\n"
 
-        return await self.ai.generate_text(full_conversation, system_prompt=system_prompt)
+        answer = await self.llm(TaskType.CHAT).generate_text(full_conversation, system_prompt=system_prompt, cache=False)
+        if use_semantic_cache and answer:
+            semantic_cache.add(course_id, course_version, question_embedding, answer)
+        return answer
 
 class QuizGeneratorService(AIService):
     async def generate_lesson_quiz(self, lesson_id: int) -> Dict[str, Any]:
@@ -112,7 +146,7 @@ class QuizGeneratorService(AIService):
         
         system_prompt = "You are an expert curriculum designer. Create high-quality, pedagogical quizzes."
         
-        return await self.ai.generate_json(prompt, schema=quiz_schema, system_prompt=system_prompt)
+        return await self.llm(TaskType.QUIZ).generate_json(prompt, schema=quiz_schema, system_prompt=system_prompt)
 
 class CodeAssistantService(AIService):
     async def explain_code(self, code: str, language: str = "python") -> str:
@@ -126,7 +160,7 @@ class CodeAssistantService(AIService):
         
         prompt = f"Explain this code and suggest improvements:\n\n```{language}\n{code}\n```"
         
-        return await self.ai.generate_text(prompt, system_prompt=system_prompt)
+        return await self.llm(TaskType.CODING).generate_text(prompt, system_prompt=system_prompt)
 
 class CourseGeneratorService(AIService):
     async def generate_course(self, user_id: str, topic: str, difficulty: str = "beginner", target_audience: str = None) -> Dict[str, Any]:
@@ -134,7 +168,7 @@ class CourseGeneratorService(AIService):
         Generate a complete course structure and save it to the database.
         """
         from app.crud import crud_course as crud
-        from app.schemas.course import CourseCreate, ModuleCreate, LessonCreate
+        from app.schemas.course import CourseTreeCreate
 
         # 1. Define Course Structure Schema
         course_schema = {
@@ -186,40 +220,41 @@ class CourseGeneratorService(AIService):
         )
         
         try:
-            generated_data = await self.ai.generate_json(prompt, schema=course_schema, system_prompt=system_prompt)
+            # Each request creates a new course, so it always gets a fresh generation
+            generated_data = await self.llm(TaskType.COURSE).generate_json(
+                prompt, schema=course_schema, system_prompt=system_prompt, cache=False
+            )
             
             if "error" in generated_data:
                 return generated_data
 
-            # 3. Persist to Database
-            # Create Course
-            course_in = CourseCreate(
+            # 3. Persist to Database (whole tree in one transaction)
+            course_in = CourseTreeCreate(
                 title=generated_data["title"],
-                description=generated_data["description"]
+                description=generated_data["description"],
+                modules=[
+                    {
+                        "title": module_data["title"],
+                        "description": module_data["description"],
+                        "order": i,
+                        "lessons": [
+                            {
+                                "title": lesson_data["title"],
+                                "content": lesson_data["content"],
+                                "order": j,
+                            }
+                            for j, lesson_data in enumerate(module_data["lessons"])
+                        ],
+                    }
+                    for i, module_data in enumerate(generated_data["modules"])
+                ],
             )
-            db_course = await crud.course.create(self.db, obj_in=course_in, instructor_id=user_id)
-
-            # Create Modules & Lessons
-            for i, module_data in enumerate(generated_data["modules"]):
-                module_in = ModuleCreate(
-                    title=module_data["title"],
-                    description=module_data["description"],
-                    order=i
-                )
-                db_module = await crud.module.create(self.db, obj_in=module_in, course_id=db_course.id)
-
-                for j, lesson_data in enumerate(module_data["lessons"]):
-                    lesson_in = LessonCreate(
-                        title=lesson_data["title"],
-                        content=lesson_data["content"],
-                        order=j
-                    )
-                    await crud.lesson.create(self.db, obj_in=lesson_in, module_id=db_module.id)
+            course_id = await crud.course.create_tree(self.db, obj_in=course_in, instructor_id=user_id)
 
             return {
-                "course_id": db_course.id,
-                "title": db_course.title,
-                "message": f"Successfully generated course '{db_course.title}' with {len(generated_data['modules'])} modules."
+                "course_id": course_id,
+                "title": course_in.title,
+                "message": f"Successfully generated course '{course_in.title}' with {len(course_in.modules)} modules."
             }
 
         except Exception as e:
@@ -29,6 +29,6 @@ class LLMProvider(ABC):
         pass
 
     @abstractmethod
-    async def get_embeddings(self, text: Union[str, List[str]]) -> List[List[float]]:
+    async def get_embeddings(self, text: Union[str, List[str]], **kwargs) -> List[List[float]]:
         """Generate vector embeddings for retrieval."""
         pass
@@ -1,6 +1,11 @@
 from enum import Enum
+from typing import Dict, Optional
+from app.core.config import settings
 from app.services.ai.base_provider import LLMProvider
-from app.services.ai.gemini_provider import GeminiProvider
+from app.services.ai.registry import ProviderRegistry, ai_registry
+from app.services.ai.response_cache import CachedProvider
+from app.services.ai.routing import ModelRoute, RoutedProvider, parse_route
+from app.services.ai.singleflight import SingleFlightProvider
 
 class TaskType(str, Enum):
     GENERAL = "general"
@@ -8,14 +13,29 @@ class TaskType(str, Enum):
     SUMMARY = "summary"
     QUIZ = "quiz"
     CHAT = "chat"
+    EXPANSION = "expansion" # short query rewriting before retrieval
+    COURSE = "course"
+    EMBEDDING = "embedding"
 
-def get_ai_provider(task: TaskType = TaskType.GENERAL) -> LLMProvider:
+def load_routes(config: Dict[str, Dict]) -> Dict[TaskType, ModelRoute]:
+    routes = {TaskType(task): parse_route(route) for task, route in config.items()}
+    if TaskType.GENERAL not in routes or TaskType.EMBEDDING not in routes:
+        raise ValueError("AI_MODEL_ROUTES must define 'general' and 'embedding' routes")
+    return routes
+
+MODEL_ROUTES = load_routes(settings.AI_MODEL_ROUTES)
+
+def get_ai_provider(
+    task: TaskType = TaskType.GENERAL,
+    registry: Optional[ProviderRegistry] = None,
+) -> LLMProvider:
     """
-    Factory function to get the appropriate AI provider.
-    Currently defaults to Gemini for all tasks to leverage the free tier.
+    Factory function to get the AI provider for a task.
+    The task picks its model, limits and fallbacks from AI_MODEL_ROUTES;
+    providers come from the process-wide registry, so HTTP clients are shared.
+    Identical requests are answered from the response cache unless a call passes cache=False,
+    and concurrent identical requests share one in-flight call.
     """
-    # In the future, this can branch based on task type:
-    # if task == TaskType.CODING: 
-    #     return OpenAIProvider(model="gpt-4")
-    
-    return GeminiProvider()
+    route = MODEL_ROUTES.get(task, MODEL_ROUTES[TaskType.GENERAL])
+    routed = RoutedProvider(registry or ai_registry, route, MODEL_ROUTES[TaskType.EMBEDDING])
+    return SingleFlightProvider(CachedProvider(routed))
@@ -4,18 +4,21 @@ from openai import AsyncOpenAI
 from app.services.ai.base_provider import LLMProvider
 from app.core.config import settings
 
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+
 class GeminiProvider(LLMProvider):
     """
     Gemini 2.0 implementation using OpenAI compatibility layer.
     Allows use of Google's powerful models with the standard OpenAI SDK.
     """
 
-    def __init__(self, model: str = "gemini-2.0-flash"):
+    def __init__(self, model: str = "gemini-2.0-flash", client: Optional[AsyncOpenAI] = None):
         self.model = model
-        # Configuration for Google's OpenAI-compatible endpoint
-        self.client = AsyncOpenAI(
+        # Configuration for Google's OpenAI-compatible endpoint; the registry
+        # passes in a pooled client shared across providers and requests
+        self.client = client or AsyncOpenAI(
             api_key=settings.GOOGLE_API_KEY,
-            base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
+            base_url=GEMINI_BASE_URL
         )
 
     async def generate_text(
@@ -65,11 +68,12 @@ class GeminiProvider(LLMProvider):
                 return json.loads(result_text[start:end])
             return {"error": "Failed to parse AI response as JSON", "raw": result_text}
 
-    async def get_embeddings(self, text: Union[str, List[str]]) -> List[List[float]]:
+    async def get_embeddings(self, text: Union[str, List[str]], **kwargs) -> List[List[float]]:
         # Using OpenAI-style embedding call (mapped to Google gecko/text-embedding models)
         input_text = [text] if isinstance(text, str) else text
         response = await self.client.embeddings.create(
-            model="text-embedding-004", # Google default
-            input=input_text
+            model=kwargs.pop("model", "text-embedding-004"), # Google default
+            input=input_text,
+            **kwargs
         )
         return [data.embedding for data in response.data]
@@ -1,17 +1,19 @@
 from typing import List, Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
 from app import models
-from app.services.ai.factory import get_ai_provider
+from app.services.ai.factory import get_ai_provider, TaskType
 from app.services.ai.pinecone_service import pinecone_service
+from app.services.ai.registry import ProviderRegistry
 import logging
 
 logger = logging.getLogger(__name__)
 
 class ContentIngestor:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, registry: Optional[ProviderRegistry] = None):
         self.db = db
-        self.ai = get_ai_provider()
+        self.ai = get_ai_provider(TaskType.EMBEDDING, registry=registry)
 
     def chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
         """Simple sliding window chunking."""
@@ -37,7 +39,9 @@ class ContentIngestor:
         """Invert a course's content into Pinecone."""
         # Fetch course with modules and lessons
         result = await self.db.execute(
-            select(models.course.Course).filter(models.course.Course.id == course_id)
+            select(models.course.Course)
+            .options(selectinload(models.course.Course.modules).selectinload(models.course.Module.lessons))
+            .filter(models.course.Course.id == course_id)
         )
         course = result.scalars().first()
         if not course:
@@ -78,16 +82,26 @@ class ContentIngestor:
             await pinecone_service.upsert_vectors(all_vectors, namespace="courses")
             logger.info(f"Ingested {len(all_vectors)} vectors for course {course_id}")
             
-    async def search_course_content(self, query: str, course_id: Optional[int] = None, top_k: int = 3):
-        """Search course content for RAG."""
-        embedding = await self.ai.get_embeddings([query])
+    async def embed_query(self, query: str) -> List[float]:
+        return (await self.ai.get_embeddings([query]))[0]
+
+    async def search_course_content(
+        self,
+        query: str,
+        course_id: Optional[int] = None,
+        top_k: int = 3,
+        embedding: Optional[List[float]] = None,
+    ):
+        """Search course content for RAG. Pass `embedding` when the query is already embedded."""
+        if embedding is None:
+            embedding = await self.embed_query(query)
         
         filter_dict = None
         if course_id:
             filter_dict = {"course_id": {"$eq": course_id}}
             
         return await pinecone_service.query_vectors(
-            vector=embedding[0],
+            vector=embedding,
             top_k=top_k,
             namespace="courses",
             filter=filter_dict
@@ -0,0 +1,77 @@
+import logging
+from typing import Any, Dict, Tuple
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from app.core.config import settings
+from app.services.ai.base_provider import LLMProvider
+from app.services.ai.gemini_provider import GEMINI_BASE_URL, GeminiProvider
+
+logger = logging.getLogger(__name__)
+
+class ProviderRegistry:
+    """
+    Process-wide LLM providers, created lazily on first use.
+    Each provider name gets one pooled, keep-alive HTTP client that every
+    model of that provider shares, so requests reuse warm TLS connections.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, AsyncOpenAI] = {}
+        self._providers: Dict[Tuple[str, str], LLMProvider] = {}
+
+    def _build_client(self, provider: str) -> AsyncOpenAI:
+        if provider != "gemini":
+            raise ValueError(f"Unknown AI provider: {provider}")
+
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(
+                settings.AI_HTTP_TIMEOUT_SECONDS,
+                connect=settings.AI_HTTP_CONNECT_TIMEOUT_SECONDS,
+            ),
+        )
+        return AsyncOpenAI(
+            api_key=settings.GOOGLE_API_KEY,
+            base_url=GEMINI_BASE_URL,
+            max_retries=settings.AI_MAX_RETRIES,
+            http_client=http_client,
+        )
+
+    def get(self, provider: str, model: str) -> LLMProvider:
+        key = (provider, model)
+        instance = self._providers.get(key)
+        if instance is None:
+            client = self._clients.get(provider)
+            if client is None:
+                client = self._clients[provider] = self._build_client(provider)
+                logger.info(f"Created pooled HTTP client for AI provider '{provider}'")
+            instance = self._providers[key] = GeminiProvider(model=model, client=client)
+        return instance
+
+    async def close(self) -> None:
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._providers.clear()
+        for client in clients:
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close AI provider client: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": sorted(self._clients),
+            "providers": [f"{provider}:{model}" for provider, model in self._providers],
+        }
+
+ai_registry = ProviderRegistry()
+
+def get_ai_registry() -> ProviderRegistry:
+    """FastAPI dependency; override it in tests to inject stub providers."""
+    return ai_registry
@@ -0,0 +1,247 @@
+import hashlib
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+
+from sqlalchemy import delete, func, select
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.db.upsert import insert
+from app.models.ai_cache import AIResponseCache
+from app.services.ai.base_provider import LLMProvider
+
+logger = logging.getLogger(__name__)
+
+class CachedResponse(NamedTuple):
+    value: str
+    latency_ms: float # duration of the LLM call that produced it
+
+class ResponseStore(ABC):
+    """Storage for cached LLM responses, keyed by request hash."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, model: str, entry: CachedResponse, ttl: float) -> None:
+        pass
+
+class MemoryResponseStore(ResponseStore):
+    """Per-process LRU with TTL."""
+
+    def __init__(self, maxsize: int):
+        self.local = TTLCache(maxsize=maxsize)
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        return self.local.get(key)
+
+    async def set(self, key: str, model: str, entry: CachedResponse, ttl: float) -> None:
+        self.local.set(key, entry, ttl=ttl)
+
+class SQLResponseStore(ResponseStore):
+    """
+    Responses shared by all workers in the ai_response_cache table.
+    Every `prune_every` writes, expired rows are deleted and the table is
+    trimmed to `max_rows`, soonest-expiring first.
+    """
+
+    def __init__(self, max_rows: int, prune_every: int = 100):
+        self.max_rows = max_rows
+        self.prune_every = prune_every
+        self._writes = 0
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        async with AsyncSessionLocal() as db:
+            row = (await db.execute(
+                select(AIResponseCache.value, AIResponseCache.latency_ms).where(
+                    AIResponseCache.key == key,
+                    AIResponseCache.expires_at > datetime.now(timezone.utc),
+                )
+            )).first()
+        return CachedResponse(row.value, row.latency_ms) if row else None
+
+    async def set(self, key: str, model: str, entry: CachedResponse, ttl: float) -> None:
+        now = datetime.now(timezone.utc)
+        values = {
+            "key": key,
+            "model": model,
+            "value": entry.value,
+            "latency_ms": entry.latency_ms,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=ttl),
+        }
+        async with AsyncSessionLocal() as db:
+            stmt = insert(db, AIResponseCache).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[AIResponseCache.key],
+                set_={name: stmt.excluded[name] for name in values if name != "key"},
+            )
+            await db.execute(stmt)
+            self._writes += 1
+            if self._writes % self.prune_every == 0:
+                await self.prune(db)
+            await db.commit()
+
+    async def prune(self, db) -> None:
+        await db.execute(delete(AIResponseCache).where(AIResponseCache.expires_at <= datetime.now(timezone.utc)))
+        excess = await db.scalar(select(func.count()).select_from(AIResponseCache)) - self.max_rows
+        if excess > 0:
+            oldest = select(AIResponseCache.key).order_by(AIResponseCache.expires_at).limit(excess)
+            await db.execute(delete(AIResponseCache).where(AIResponseCache.key.in_(oldest)))
+
+class ResponseCache:
+    """
+    Exact-match cache of LLM responses over one or more stores, checked in
+    order; a hit in a later store is copied into the earlier ones.
+    Store failures are logged and treated as misses.
+    """
+
+    def __init__(self, stores: List[ResponseStore], ttl: float, enabled: bool = True):
+        self.stores = stores
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.saved_ms = 0.0
+
+    @staticmethod
+    def make_key(operation: str, model: str, system_prompt: Optional[str], prompt: str,
+                 schema: Optional[Dict[str, Any]], params: Dict[str, Any]) -> str:
+        payload = json.dumps(
+            [operation, model, system_prompt, prompt, schema, params],
+            sort_keys=True, separators=(",", ":"), default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def get(self, key: str, model: str) -> Optional[CachedResponse]:
+        started = time.perf_counter()
+        for i, store in enumerate(self.stores):
+            try:
+                entry = await store.get(key)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"AI response cache read failed: {e}")
+                continue
+            if entry is not None:
+                for earlier in self.stores[:i]:
+                    await self._set(earlier, key, model, entry)
+                self.hits += 1
+                lookup_ms = (time.perf_counter() - started) * 1000
+                self.saved_ms += max(entry.latency_ms - lookup_ms, 0.0)
+                return entry
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, model: str, entry: CachedResponse) -> None:
+        for store in self.stores:
+            await self._set(store, key, model, entry)
+
+    async def _set(self, store: ResponseStore, key: str, model: str, entry: CachedResponse) -> None:
+        try:
+            await store.set(key, model, entry, self.ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"AI response cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "stores": [type(store).__name__ for store in self.stores],
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "errors": self.errors,
+            "latency_saved_ms": round(self.saved_ms, 2),
+        }
+
+def build_response_cache() -> ResponseCache:
+    stores: List[ResponseStore] = [MemoryResponseStore(settings.AI_RESPONSE_CACHE_SIZE)]
+    if settings.AI_RESPONSE_CACHE_BACKEND == "sql":
+        stores.append(SQLResponseStore(settings.AI_RESPONSE_CACHE_MAX_ROWS))
+    return ResponseCache(
+        stores,
+        ttl=settings.AI_RESPONSE_CACHE_TTL_SECONDS,
+        enabled=settings.AI_RESPONSE_CACHE_ENABLED,
+    )
+
+response_cache = build_response_cache()
+
+class CachedProvider(LLMProvider):
+    """
+    Serves repeated generate_text/generate_json calls from the response cache.
+    Pass `cache=False` to a call to always hit the model, e.g. for open-ended
+    generations. Embeddings are passed through.
+    """
+
+    def __init__(self, provider: LLMProvider, cache: ResponseCache = response_cache):
+        self.provider = provider
+        self.cache = cache
+
+    @property
+    def model(self) -> str:
+        return getattr(self.provider, "model", type(self.provider).__name__)
+
+    @property
+    def default_params(self) -> Dict[str, Any]:
+        return getattr(self.provider, "default_params", {})
+
+    def _key(self, operation: str, prompt: str, system_prompt: Optional[str],
+             schema: Optional[Dict[str, Any]], kwargs: Dict[str, Any]) -> str:
+        # Timeouts don't change the answer; route limits such as max_tokens do
+        params = {**getattr(self.provider, "default_params", {}), **kwargs}
+        params.pop("timeout", None)
+        return self.cache.make_key(operation, self.model, system_prompt, prompt, schema, params)
+
+    async def generate_text(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        **kwargs
+    ) -> str:
+        if not (kwargs.pop("cache", True) and self.cache.enabled):
+            return await self.provider.generate_text(prompt, system_prompt=system_prompt, **kwargs)
+
+        key = self._key("text", prompt, system_prompt, None, kwargs)
+        entry = await self.cache.get(key, self.model)
+        if entry is not None:
+            return entry.value
+
+        started = time.perf_counter()
+        result = await self.provider.generate_text(prompt, system_prompt=system_prompt, **kwargs)
+        if result:
+            await self.cache.set(key, self.model, CachedResponse(result, (time.perf_counter() - started) * 1000))
+        return result
+
+    async def generate_json(
+        self,
+        prompt: str,
+        schema: Dict[str, Any],
+        system_prompt: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        if not (kwargs.pop("cache", True) and self.cache.enabled):
+            return await self.provider.generate_json(prompt, schema=schema, system_prompt=system_prompt, **kwargs)
+
+        key = self._key("json", prompt, system_prompt, schema, kwargs)
+        entry = await self.cache.get(key, self.model)
+        if entry is not None:
+            return json.loads(entry.value)
+
+        started = time.perf_counter()
+        result = await self.provider.generate_json(prompt, schema=schema, system_prompt=system_prompt, **kwargs)
+        if "error" not in result: # unparseable responses are retried next time
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            await self.cache.set(key, self.model, CachedResponse(json.dumps(result), elapsed_ms))
+        return result
+
+    async def get_embeddings(self, text: Union[str, List[str]], **kwargs) -> List[List[float]]:
+        kwargs.pop("cache", None)
+        return await self.provider.get_embeddings(text, **kwargs)
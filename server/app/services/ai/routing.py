@@ -0,0 +1,100 @@
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+
+from openai import APIError
+
+from app.services.ai.base_provider import LLMProvider
+from app.services.ai.registry import ProviderRegistry
+
+logger = logging.getLogger(__name__)
+
+class ModelTarget(NamedTuple):
+    provider: str
+    model: str
+
+class ModelRoute(NamedTuple):
+    """Where one task type is sent: a primary model, ordered fallbacks and per-call limits."""
+    targets: List[ModelTarget]
+    max_tokens: Optional[int] = None
+    timeout: Optional[float] = None
+
+    def options(self) -> Dict[str, Any]:
+        options: Dict[str, Any] = {}
+        if self.max_tokens is not None:
+            options["max_tokens"] = self.max_tokens
+        if self.timeout is not None:
+            options["timeout"] = self.timeout
+        return options
+
+def parse_route(config: Dict[str, Any]) -> ModelRoute:
+    """
+    Build a route from its settings entry, e.g.
+    {"provider": "gemini", "model": "...", "max_tokens": 64, "timeout": 10,
+     "fallbacks": [{"provider": "gemini", "model": "..."}]}
+    """
+    provider = config.get("provider", "gemini")
+    targets = [ModelTarget(provider, config["model"])]
+    for fallback in config.get("fallbacks", []):
+        if isinstance(fallback, str):
+            fallback = {"model": fallback}
+        targets.append(ModelTarget(fallback.get("provider", provider), fallback["model"]))
+    return ModelRoute(
+        targets=targets,
+        max_tokens=config.get("max_tokens"),
+        timeout=config.get("timeout"),
+    )
+
+class RoutedProvider(LLMProvider):
+    """
+    Sends generation calls down a route's model chain, moving to the next
+    model when a provider errors or times out. Embeddings always follow the
+    embedding route, since vectors must match the ones already indexed.
+    """
+
+    def __init__(self, registry: ProviderRegistry, route: ModelRoute, embedding_route: ModelRoute):
+        self.registry = registry
+        self.route = route
+        self.embedding_route = embedding_route
+
+    @property
+    def model(self) -> str:
+        return self.route.targets[0].model
+
+    @property
+    def default_params(self) -> Dict[str, Any]:
+        return self.route.options()
+
+    async def _call(self, route: ModelRoute, method: str, *args, pass_model: bool = False, **kwargs) -> Any:
+        kwargs = {**route.options(), **kwargs}
+        last_error: Optional[Exception] = None
+        for target in route.targets:
+            provider = self.registry.get(target.provider, target.model)
+            call_kwargs = {"model": target.model, **kwargs} if pass_model else kwargs
+            try:
+                return await getattr(provider, method)(*args, **call_kwargs)
+            except APIError as e:
+                last_error = e
+                logger.warning(f"AI {method} failed on {target.provider}:{target.model}: {e}")
+        raise last_error
+
+    async def generate_text(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        **kwargs
+    ) -> str:
+        return await self._call(self.route, "generate_text", prompt, system_prompt=system_prompt, **kwargs)
+
+    async def generate_json(
+        self,
+        prompt: str,
+        schema: Dict[str, Any],
+        system_prompt: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        return await self._call(
+            self.route, "generate_json", prompt, schema=schema, system_prompt=system_prompt, **kwargs
+        )
+
+    async def get_embeddings(self, text: Union[str, List[str]], **kwargs) -> List[List[float]]:
+        return await self._call(self.embedding_route, "get_embeddings", text, pass_model=True, **kwargs)
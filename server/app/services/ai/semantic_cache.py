@@ -0,0 +1,103 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+class _CourseAnswers:
+    """Unit-normalized question embeddings (one row each) and their answers for one course version."""
+
+    def __init__(self, version: int, dimension: int):
+        self.version = version
+        self.vectors = np.empty((0, dimension), dtype=np.float32)
+        self.expires_at = np.empty(0, dtype=np.float64)
+        self.answers: List[str] = []
+
+    def add(self, vector: np.ndarray, answer: str, expires_at: float, max_entries: int) -> None:
+        self.vectors = np.vstack([self.vectors, vector[None, :]])[-max_entries:]
+        self.expires_at = np.append(self.expires_at, expires_at)[-max_entries:]
+        self.answers = (self.answers + [answer])[-max_entries:]
+
+class SemanticAnswerCache:
+    """
+    Tutor answers to first-turn questions, per course, matched by cosine
+    similarity of the question embedding. Each course's embeddings are one
+    matrix, so a lookup is a single matrix-vector product.
+    Per process. Entries are keyed by courses.version, which is the only
+    invalidation: once a course's content changes, every worker drops the
+    answers built from the old version on its next lookup.
+    """
+
+    def __init__(self, threshold: float, max_entries: int, max_courses: int, ttl: float):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_courses = max_courses
+        self.ttl = ttl
+        self._courses: "OrderedDict[int, _CourseAnswers]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def lookup(self, course_id: int, version: int, embedding: Sequence[float]) -> Optional[str]:
+        entries = self._courses.get(course_id)
+        if entries is not None and entries.version != version:
+            self.invalidate(course_id)
+            entries = None
+        vector = self._normalize(embedding)
+        if entries is None or vector is None or not entries.answers or entries.vectors.shape[1] != vector.shape[0]:
+            self.misses += 1
+            return None
+
+        similarities = entries.vectors @ vector
+        similarities[entries.expires_at <= time.monotonic()] = -1.0
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            self.misses += 1
+            return None
+
+        self._courses.move_to_end(course_id)
+        self.hits += 1
+        return entries.answers[best]
+
+    def add(self, course_id: int, version: int, embedding: Sequence[float], answer: str) -> None:
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+        entries = self._courses.get(course_id)
+        if entries is None or entries.version != version or entries.vectors.shape[1] != vector.shape[0]:
+            entries = self._courses[course_id] = _CourseAnswers(version, vector.shape[0])
+        entries.add(vector, answer, time.monotonic() + self.ttl, self.max_entries)
+        self._courses.move_to_end(course_id)
+        while len(self._courses) > self.max_courses:
+            self._courses.popitem(last=False)
+
+    def invalidate(self, course_id: int) -> None:
+        if self._courses.pop(course_id, None) is not None:
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "courses": len(self._courses),
+            "entries": sum(len(entries.answers) for entries in self._courses.values()),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+semantic_cache = SemanticAnswerCache(
+    threshold=settings.AI_SEMANTIC_CACHE_THRESHOLD,
+    max_entries=settings.AI_SEMANTIC_CACHE_MAX_ENTRIES_PER_COURSE,
+    max_courses=settings.AI_SEMANTIC_CACHE_MAX_COURSES,
+    ttl=settings.AI_SEMANTIC_CACHE_TTL_SECONDS,
+)
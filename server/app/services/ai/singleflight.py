@@ -0,0 +1,111 @@
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar, Union
+
+from app.services.ai.base_provider import LLMProvider
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution.
+    The first caller starts the work as a task; later callers await the same
+    task. Each caller awaits through asyncio.shield, so a caller that is
+    cancelled (e.g. its client disconnected) stops waiting without cancelling
+    the work for the others. Work whose callers all left still runs to
+    completion, so its result can fill the response cache.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.executions = 0
+        self.deduplicated = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.executions += 1
+        else:
+            self.deduplicated += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Retrieve the error so it isn't reported as unhandled when every caller has gone
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Coalesced AI call failed: {task.exception()}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "executions": self.executions,
+            "deduplicated": self.deduplicated,
+        }
+
+ai_singleflight = SingleFlight()
+
+class SingleFlightProvider(LLMProvider):
+    """
+    Shares one in-flight provider call between concurrent identical requests,
+    e.g. a whole class opening the same lesson quiz at once.
+    Calls made with `cache=False` expect a fresh generation and are not coalesced.
+    """
+
+    def __init__(self, provider: LLMProvider, flight: SingleFlight = ai_singleflight):
+        self.provider = provider
+        self.flight = flight
+
+    @property
+    def model(self) -> str:
+        return getattr(self.provider, "model", type(self.provider).__name__)
+
+    def _key(self, operation: str, payload: Any, kwargs: Dict[str, Any]) -> str:
+        params = {**getattr(self.provider, "default_params", {}), **kwargs}
+        params.pop("timeout", None)
+        encoded = json.dumps([operation, self.model, payload, params], sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    async def generate_text(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        **kwargs
+    ) -> str:
+        if kwargs.get("cache") is False:
+            return await self.provider.generate_text(prompt, system_prompt=system_prompt, **kwargs)
+        key = self._key("text", [system_prompt, prompt], kwargs)
+        return await self.flight.do(
+            key, lambda: self.provider.generate_text(prompt, system_prompt=system_prompt, **kwargs)
+        )
+
+    async def generate_json(
+        self,
+        prompt: str,
+        schema: Dict[str, Any],
+        system_prompt: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        if kwargs.get("cache") is False:
+            return await self.provider.generate_json(prompt, schema=schema, system_prompt=system_prompt, **kwargs)
+        key = self._key("json", [system_prompt, prompt, schema], kwargs)
+        result = await self.flight.do(
+            key, lambda: self.provider.generate_json(prompt, schema=schema, system_prompt=system_prompt, **kwargs)
+        )
+        # Every waiter receives the same dict; give each caller its own copy to mutate
+        return copy.deepcopy(result)
+
+    async def get_embeddings(self, text: Union[str, List[str]], **kwargs) -> List[List[float]]:
+        key = self._key("embeddings", text, kwargs)
+        return await self.flight.do(key, lambda: self.provider.get_embeddings(text, **kwargs))
@@ -0,0 +1,127 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional
+
+from app.core.cache import TTLCache, get_shared_cache
+from app.core.config import settings
+
+class CachedCourse(NamedTuple):
+    """A course tree encoded once as JSON, plus the validators for conditional GETs."""
+    body: bytes
+    version: int
+    is_published: bool
+    last_modified: datetime
+
+class CachedLessonContext(NamedTuple):
+    """Encoded lesson navigation context and the course version it was built from."""
+    course_id: int
+    version: int
+    body: bytes
+
+class CourseCache:
+    """
+    Serialized course outlines (course -> modules -> lessons, without lesson
+    content) as JSON bytes.
+    An in-process LRU with TTL sits in front of the optional shared cache;
+    course, module and lesson writes invalidate both. Invalidation only reaches
+    the local tier of the worker that made the write, so readers pass the
+    current courses.version and entries built from an older version are dropped.
+    Lesson navigation contexts are not invalidated; each entry records the course
+    version it was computed from and is only used while that version is current.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, context_maxsize: int):
+        self.ttl = ttl
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.lesson_contexts = TTLCache(maxsize=context_maxsize, ttl=ttl)
+
+    @staticmethod
+    def _tree_key(course_id: int) -> str:
+        return f"course:{course_id}:outline"
+
+    @staticmethod
+    def _encode(entry: CachedCourse) -> bytes:
+        # One header line with the validators, then the body untouched
+        header = json.dumps([entry.version, entry.is_published, entry.last_modified.isoformat()])
+        return header.encode("utf-8") + b"\n" + entry.body
+
+    @staticmethod
+    def _decode(raw: bytes) -> CachedCourse:
+        header, body = raw.split(b"\n", 1)
+        version, is_published, last_modified = json.loads(header)
+        return CachedCourse(body, version, is_published, datetime.fromisoformat(last_modified))
+
+    async def get_tree(self, course_id: int, version: int) -> Optional[CachedCourse]:
+        """Cached tree for `course_id`, only if it was built from `version`."""
+        key = self._tree_key(course_id)
+        entry = self.local.get(key)
+        if entry is not None:
+            if entry.version == version:
+                return entry
+            # Changed through another worker since this copy was cached
+            self.local.delete(key)
+
+        shared = get_shared_cache()
+        if shared:
+            raw = await shared.get(key)
+            if raw is not None:
+                try:
+                    entry = self._decode(raw if isinstance(raw, bytes) else raw.encode("utf-8"))
+                except ValueError:
+                    # Written by an older release in a different format
+                    return None
+                if entry.version == version:
+                    self.local.set(key, entry)
+                    return entry
+        return None
+
+    async def set_tree(self, course_id: int, entry: CachedCourse) -> None:
+        key = self._tree_key(course_id)
+        self.local.set(key, entry)
+        shared = get_shared_cache()
+        if shared:
+            await shared.set(key, self._encode(entry), ttl=self.ttl)
+
+    @staticmethod
+    def _context_key(lesson_id: int) -> str:
+        return f"lesson:{lesson_id}:context"
+
+    async def get_lesson_context(self, lesson_id: int) -> Optional[CachedLessonContext]:
+        key = self._context_key(lesson_id)
+        entry = self.lesson_contexts.get(key)
+        if entry is not None:
+            return entry
+
+        shared = get_shared_cache()
+        if shared:
+            raw = await shared.get(key)
+            if raw is not None:
+                header, body = raw.split(b"\n", 1)
+                course_id, version = json.loads(header)
+                entry = CachedLessonContext(course_id, version, body)
+                self.lesson_contexts.set(key, entry)
+        return entry
+
+    async def set_lesson_context(self, lesson_id: int, entry: CachedLessonContext) -> None:
+        key = self._context_key(lesson_id)
+        self.lesson_contexts.set(key, entry)
+        shared = get_shared_cache()
+        if shared:
+            header = json.dumps([entry.course_id, entry.version]).encode("utf-8")
+            await shared.set(key, header + b"\n" + entry.body, ttl=self.ttl)
+
+    async def invalidate(self, course_id: int) -> None:
+        key = self._tree_key(course_id)
+        self.local.delete(key)
+        shared = get_shared_cache()
+        if shared:
+            await shared.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.local.stats(), "lesson_contexts": self.lesson_contexts.stats()}
+
+course_cache = CourseCache(
+    maxsize=settings.COURSE_CACHE_SIZE,
+    ttl=settings.COURSE_CACHE_TTL_SECONDS,
+    context_maxsize=settings.LESSON_CONTEXT_CACHE_SIZE,
+)
@@ -0,0 +1,170 @@
+import codecs
+import csv
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud import user as crud_user
+from app.crud.crud_enrollment import enrollment as crud_enrollment
+
+logger = logging.getLogger(__name__)
+
+CSV_TYPES = {"text/csv", "application/csv"}
+NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"}
+
+# A single record never needs more than this; longer lines are rejected instead of buffered
+MAX_LINE_LENGTH = 8192
+MAX_INVALID_SAMPLES = 20
+
+ID_COLUMNS = {"user_id", "id", "uid"}
+EMAIL_COLUMNS = {"email", "e-mail", "email_address"}
+
+def import_format(content_type: Optional[str]) -> Optional[str]:
+    """Map a request Content-Type to "csv" / "ndjson", or None if unsupported."""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in CSV_TYPES:
+        return "csv"
+    if media_type in NDJSON_TYPES:
+        return "ndjson"
+    return None
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into text lines, holding at most one partial line in memory."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+        if len(pending) > MAX_LINE_LENGTH:
+            raise ValueError(f"Line longer than {MAX_LINE_LENGTH} characters")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+def _classify(value: str) -> Tuple[str, str]:
+    value = value.strip()
+    return ("email", value) if "@" in value else ("id", value)
+
+class EnrollmentImportService:
+    """
+    Enrolls a cohort from a streamed CSV or NDJSON body.
+    Records are user ids or emails; they are resolved and inserted in batches
+    (one lookup and one INSERT ... ON CONFLICT DO NOTHING per batch), so memory
+    use is bounded by the batch size rather than the upload.
+    """
+
+    def __init__(self, db: AsyncSession, batch_size: Optional[int] = None):
+        self.db = db
+        self.batch_size = batch_size or settings.ENROLLMENT_IMPORT_BATCH_SIZE
+        self.created = 0
+        self.existing = 0
+        self.invalid = 0
+        self.invalid_samples: List[str] = []
+
+    async def run(self, *, course_id: int, chunks: AsyncIterator[bytes], fmt: str) -> Dict[str, Any]:
+        records = self._parse_csv(chunks) if fmt == "csv" else self._parse_ndjson(chunks)
+        batch: List[Tuple[str, str]] = []
+        async for record in records:
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                await self._enroll_batch(course_id, batch)
+                batch = []
+        if batch:
+            await self._enroll_batch(course_id, batch)
+
+        logger.info(
+            f"Bulk enrollment into course {course_id}: {self.created} created, "
+            f"{self.existing} existing, {self.invalid} invalid"
+        )
+        return {
+            "created": self.created,
+            "existing": self.existing,
+            "invalid": self.invalid,
+            "invalid_samples": self.invalid_samples,
+        }
+
+    def _reject(self, raw: str) -> None:
+        self.invalid += 1
+        if len(self.invalid_samples) < MAX_INVALID_SAMPLES:
+            self.invalid_samples.append(raw[:200])
+
+    async def _parse_csv(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[str, str]]:
+        columns: Optional[Dict[str, int]] = None
+        first = True
+        async for line in iter_lines(chunks):
+            if not line.strip():
+                continue
+            fields = next(csv.reader([line]), [])
+            if first:
+                first = False
+                header = [field.strip().lower() for field in fields]
+                id_col = next((i for i, name in enumerate(header) if name in ID_COLUMNS), None)
+                email_col = next((i for i, name in enumerate(header) if name in EMAIL_COLUMNS), None)
+                if id_col is not None or email_col is not None:
+                    columns = {"id": id_col, "email": email_col}
+                    continue
+
+            if columns is None:
+                # Headerless: one identifier per row
+                value = next((field for field in fields if field.strip()), "")
+                if value:
+                    yield _classify(value)
+                else:
+                    self._reject(line)
+                continue
+
+            for kind in ("id", "email"):
+                index = columns[kind]
+                if index is not None and index < len(fields) and fields[index].strip():
+                    yield kind, fields[index].strip()
+                    break
+            else:
+                self._reject(line)
+
+    async def _parse_ndjson(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[str, str]]:
+        async for line in iter_lines(chunks):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                self._reject(line)
+                continue
+
+            if isinstance(record, str) and record.strip():
+                yield _classify(record)
+            elif isinstance(record, dict) and any(isinstance(record.get(key), str) for key in ("user_id", "id", "email")):
+                user_id = record.get("user_id") or record.get("id")
+                if isinstance(user_id, str) and user_id.strip():
+                    yield "id", user_id.strip()
+                elif isinstance(record.get("email"), str) and record["email"].strip():
+                    yield "email", record["email"].strip()
+                else:
+                    self._reject(line)
+            else:
+                self._reject(line)
+
+    async def _enroll_batch(self, course_id: int, batch: List[Tuple[str, str]]) -> None:
+        ids = {value for kind, value in batch if kind == "id"}
+        emails = {value for kind, value in batch if kind == "email"}
+        by_id, by_email = await crud_user.resolve(self.db, ids=ids, emails=emails)
+
+        user_ids = set()
+        resolved = 0
+        for kind, value in batch:
+            user_id = by_id.get(value) if kind == "id" else by_email.get(value)
+            if user_id is None:
+                self._reject(value)
+            else:
+                user_ids.add(user_id)
+                resolved += 1
+
+        created = await crud_enrollment.create_many(self.db, course_id=course_id, user_ids=user_ids)
+        self.created += created
+        # Repeats of a user (in this batch or already enrolled) count as existing
+        self.existing += resolved - created
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.crud.crud_progress import UPSERT_CHUNK_SIZE, progress as crud_progress
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+class ProgressWriteBuffer:
+    """
+    Write-behind buffer for video progress heartbeats.
+    Heartbeats are coalesced per (user, lesson) in memory and flushed
+    periodically as one batched upsert; the latest position wins.
+    """
+
+    def __init__(self, flush_interval: float = 5.0, max_size: int = 5000):
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self._pending: Dict[Tuple[str, int], float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self.received = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.last_flush_ms = 0.0
+
+    def add(self, user_id: str, lesson_id: int, video_progress: float) -> None:
+        key = (user_id, lesson_id)
+        self.received += 1
+        if key in self._pending:
+            self.coalesced += 1
+        self._pending[key] = video_progress
+        if len(self._pending) >= self.max_size:
+            self._wakeup.set()
+
+    def peek(self, user_id: str, lesson_id: int) -> Optional[float]:
+        """Buffered position not yet written to the database, if any."""
+        return self._pending.get((user_id, lesson_id))
+
+    def discard(self, user_id: str, lesson_id: int) -> None:
+        """Drop a pending heartbeat superseded by a synchronous write."""
+        self._pending.pop((user_id, lesson_id), None)
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            # Rows are written in key order so concurrent flushes from several
+            # workers lock rows in the same order and can't deadlock
+            rows = [
+                {"user_id": user_id, "lesson_id": lesson_id, "video_progress": video_progress}
+                for (user_id, lesson_id), video_progress in sorted(pending.items())
+            ]
+
+            started = time.perf_counter()
+            written = 0
+            for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+                chunk = rows[start:start + UPSERT_CHUNK_SIZE]
+                try:
+                    async with AsyncSessionLocal() as db:
+                        written += await crud_progress.bulk_upsert_video_progress(db, rows=chunk)
+                except Exception as e:
+                    # Earlier chunks are committed; only this one is retried on the next flush
+                    logger.error(f"Progress flush failed, requeueing {len(chunk)} rows: {e}")
+                    for row in chunk:
+                        # Newer heartbeats that arrived during the flush take precedence
+                        self._pending.setdefault((row["user_id"], row["lesson_id"]), row["video_progress"])
+
+            self.flushes += 1
+            self.flushed_rows += written
+            self.last_flush_ms = (time.perf_counter() - started) * 1000
+            return written
+
+    async def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the background task and write out everything still buffered."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": len(self._pending),
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+        }
+
+progress_buffer = ProgressWriteBuffer(
+    flush_interval=settings.PROGRESS_FLUSH_INTERVAL_SECONDS,
+    max_size=settings.PROGRESS_BUFFER_MAX_SIZE,
+)
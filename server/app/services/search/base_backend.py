@@ -0,0 +1,31 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+SNIPPET_START = "<mark>"
+SNIPPET_STOP = "</mark>"
+
+class SearchBackend(ABC):
+    """
+    Full-text search over course titles/descriptions and lesson titles/content.
+    Implementations return hits as dicts with kind ("course" | "lesson"), id,
+    course_id, title, snippet (matches wrapped in <mark>) and rank (higher is better).
+    """
+
+    async def setup(self, conn: AsyncConnection) -> None:
+        """Create whatever the backend needs outside of migrations (idempotent)."""
+        pass
+
+    @abstractmethod
+    async def search(
+        self,
+        db: AsyncSession,
+        query: str,
+        *,
+        limit: int = 20,
+        offset: int = 0,
+        published_only: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """One page of hits, best match first. Callers ask for limit + 1 to detect more pages."""
+        pass
@@ -0,0 +1,26 @@
+from typing import Dict
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.services.search.base_backend import SearchBackend
+from app.services.search.postgres_backend import PostgresSearchBackend
+from app.services.search.sqlite_backend import SQLiteSearchBackend
+
+_backends: Dict[str, SearchBackend] = {
+    "postgresql": PostgresSearchBackend(),
+    "sqlite": SQLiteSearchBackend(),
+}
+
+def get_search_backend(dialect_name: str) -> SearchBackend:
+    """
+    Search backend for a database dialect: tsvector/GIN on PostgreSQL,
+    FTS5 on SQLite (local and test runs).
+    """
+    if dialect_name not in _backends:
+        raise ValueError(f"No search backend for dialect '{dialect_name}'")
+    return _backends[dialect_name]
+
+async def setup_search(engine: AsyncEngine) -> None:
+    """Prepare the search backend for `engine` (no-op where migrations own the schema)."""
+    async with engine.begin() as conn:
+        await get_search_backend(engine.dialect.name).setup(conn)
@@ -0,0 +1,67 @@
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.search.base_backend import SNIPPET_START, SNIPPET_STOP, SearchBackend
+
+# Kept in sync with the generated `search_vector` columns (migration e9a14c6b3d72)
+TEXT_SEARCH_CONFIG = "english"
+
+HEADLINE_OPTIONS = (
+    f"StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, "
+    "MaxWords=30, MinWords=10, MaxFragments=2, FragmentDelimiter=\" … \""
+)
+
+# Ranking runs on the GIN-indexed tsvectors; ts_headline, which re-parses the
+# text, only runs for the rows of the requested page.
+SEARCH_SQL = f"""
+WITH q AS (
+    SELECT websearch_to_tsquery('{TEXT_SEARCH_CONFIG}', :query) AS query
+),
+hits AS (
+    SELECT 'course' AS kind, c.id AS id, c.id AS course_id, c.title AS title,
+           c.description AS body, ts_rank(c.search_vector, q.query) AS rank
+    FROM courses c, q
+    WHERE c.search_vector @@ q.query
+      AND (c.is_published OR NOT :published_only)
+    UNION ALL
+    SELECT 'lesson', l.id, m.course_id, l.title,
+           l.content, ts_rank(l.search_vector, q.query)
+    FROM lessons l
+    JOIN modules m ON m.id = l.module_id
+    JOIN courses c ON c.id = m.course_id, q
+    WHERE l.search_vector @@ q.query
+      AND (c.is_published OR NOT :published_only)
+    ORDER BY rank DESC, kind, id
+    LIMIT :limit OFFSET :offset
+)
+SELECT hits.kind, hits.id, hits.course_id, hits.title, hits.rank,
+       ts_headline('{TEXT_SEARCH_CONFIG}', coalesce(hits.body, hits.title), q.query, :options) AS snippet
+FROM hits, q
+ORDER BY hits.rank DESC, hits.kind, hits.id
+"""
+
+class PostgresSearchBackend(SearchBackend):
+    """tsvector/GIN search with ts_rank ordering and ts_headline snippets."""
+
+    async def search(
+        self,
+        db: AsyncSession,
+        query: str,
+        *,
+        limit: int = 20,
+        offset: int = 0,
+        published_only: bool = True,
+    ) -> List[Dict[str, Any]]:
+        result = await db.execute(
+            text(SEARCH_SQL),
+            {
+                "query": query,
+                "published_only": published_only,
+                "limit": limit,
+                "offset": offset,
+                "options": HEADLINE_OPTIONS,
+            },
+        )
+        return [dict(row) for row in result.mappings().all()]
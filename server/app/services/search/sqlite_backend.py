@@ -0,0 +1,133 @@
+import logging
+import re
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.services.search.base_backend import SNIPPET_START, SNIPPET_STOP, SearchBackend
+
+logger = logging.getLogger(__name__)
+
+# Courses and lessons share one FTS5 table; rowid = id * 2 (+ 1 for lessons)
+# keeps trigger updates and deletes on the rowid instead of a table scan.
+CREATE_INDEX_SQL = """
+CREATE VIRTUAL TABLE search_index USING fts5(
+    kind UNINDEXED, ref_id UNINDEXED, title, body, tokenize = 'porter unicode61'
+)
+"""
+
+POPULATE_SQL = [
+    """
+    INSERT INTO search_index (rowid, kind, ref_id, title, body)
+    SELECT id * 2, 'course', id, title, coalesce(description, '') FROM courses
+    """,
+    """
+    INSERT INTO search_index (rowid, kind, ref_id, title, body)
+    SELECT id * 2 + 1, 'lesson', id, title, coalesce(content, '') FROM lessons
+    """,
+]
+
+TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS search_courses_ai AFTER INSERT ON courses BEGIN
+        INSERT INTO search_index (rowid, kind, ref_id, title, body)
+        VALUES (new.id * 2, 'course', new.id, new.title, coalesce(new.description, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_courses_au AFTER UPDATE OF title, description ON courses BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2;
+        INSERT INTO search_index (rowid, kind, ref_id, title, body)
+        VALUES (new.id * 2, 'course', new.id, new.title, coalesce(new.description, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_courses_ad AFTER DELETE ON courses BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_lessons_ai AFTER INSERT ON lessons BEGIN
+        INSERT INTO search_index (rowid, kind, ref_id, title, body)
+        VALUES (new.id * 2 + 1, 'lesson', new.id, new.title, coalesce(new.content, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_lessons_au AFTER UPDATE OF title, content ON lessons BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2 + 1;
+        INSERT INTO search_index (rowid, kind, ref_id, title, body)
+        VALUES (new.id * 2 + 1, 'lesson', new.id, new.title, coalesce(new.content, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_lessons_ad AFTER DELETE ON lessons BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+]
+
+SEARCH_SQL = f"""
+SELECT s.kind AS kind, s.ref_id AS id,
+       CASE s.kind WHEN 'course' THEN s.ref_id ELSE m.course_id END AS course_id,
+       s.title AS title,
+       snippet(search_index, 3, '{SNIPPET_START}', '{SNIPPET_STOP}', ' … ', 16) AS snippet,
+       -bm25(search_index, 0.0, 0.0, 10.0, 1.0) AS rank
+FROM search_index s
+LEFT JOIN lessons l ON s.kind = 'lesson' AND l.id = s.ref_id
+LEFT JOIN modules m ON m.id = l.module_id
+JOIN courses c ON c.id = CASE s.kind WHEN 'course' THEN s.ref_id ELSE m.course_id END
+WHERE search_index MATCH :query
+  AND (c.is_published OR NOT :published_only)
+ORDER BY rank DESC, kind, id
+LIMIT :limit OFFSET :offset
+"""
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+def fts5_query(query: str) -> str:
+    """
+    Turn free text into a safe FTS5 expression: every word must match (as a
+    prefix for the last one, for search-as-you-type). FTS5 syntax is not exposed.
+    """
+    tokens = _TOKEN.findall(query)
+    if not tokens:
+        return ""
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 search for local and test databases, kept current by triggers."""
+
+    async def setup(self, conn: AsyncConnection) -> None:
+        exists = (
+            await conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'")
+            )
+        ).first()
+        if not exists:
+            await conn.execute(text(CREATE_INDEX_SQL))
+            for statement in POPULATE_SQL:
+                await conn.execute(text(statement))
+            logger.info("Created and populated the FTS5 search index")
+        for statement in TRIGGERS_SQL:
+            await conn.execute(text(statement))
+
+    async def search(
+        self,
+        db: AsyncSession,
+        query: str,
+        *,
+        limit: int = 20,
+        offset: int = 0,
+        published_only: bool = True,
+    ) -> List[Dict[str, Any]]:
+        match = fts5_query(query)
+        if not match:
+            return []
+        result = await db.execute(
+            text(SEARCH_SQL),
+            {"query": match, "published_only": published_only, "limit": limit, "offset": offset},
+        )
+        return [dict(row) for row in result.mappings().all()]
@@ -0,0 +1,89 @@
+import json
+import sys
+import os
+import timeit
+from datetime import datetime, timezone
+
+# Add parent directory to path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter
+
+from app.models.course import Course, Module, Lesson
+from app.schemas.course import Course as CourseSchema, CourseOutline
+from app.core.serialization import json_array_with_field
+
+# (modules, lessons per module, KB of Markdown per lesson)
+SIZES = [(3, 5, 2), (8, 10, 8), (20, 15, 20)]
+REPEAT = 20
+
+class CourseWithProgress(CourseSchema):
+    """my-courses item as it was served with full lesson content."""
+    progress: float = 0.0
+
+course_adapter = TypeAdapter(CourseSchema)
+outline_adapter = TypeAdapter(CourseOutline)
+response_adapter = TypeAdapter(list[CourseWithProgress])
+
+def build_course(n_modules: int, n_lessons: int, content_kb: int) -> Course:
+    """Detached ORM tree shaped like what the enrollment queries load."""
+    now = datetime.now(timezone.utc)
+    content = ("Some *Markdown* with `code` and text. " * 28)[: 1024] * content_kb
+    course = Course(id=1, title="Course", description="About", instructor_id="u1",
+                    is_published=True, created_at=now, updated_at=now, version=1)
+    course.modules = [
+        Module(id=m, title=f"Module {m}", description="", course_id=1, order=m, created_at=now,
+               lessons=[
+                   Lesson(id=m * 100 + l, title=f"Lesson {l}", content=content, video_url=None,
+                          module_id=m, order=l, created_at=now)
+                   for l in range(n_lessons)
+               ])
+        for m in range(n_modules)
+    ]
+    return course
+
+def legacy(course: Course) -> bytes:
+    """Previous my-courses path: validate, dump, re-validate, then FastAPI's response_model pass."""
+    course_data = CourseSchema.model_validate(course)
+    item = CourseWithProgress(**course_data.model_dump(), progress=50.0)
+    validated = response_adapter.validate_python([item])
+    return json.dumps(response_adapter.dump_python(validated, mode="json")).encode("utf-8")
+
+def single_pass(course: Course) -> bytes:
+    """Cache miss: validate from the ORM once and dump straight to JSON bytes."""
+    tree = course_adapter.dump_json(course_adapter.validate_python(course, from_attributes=True))
+    return json_array_with_field([(tree, 50.0)], "progress")
+
+def cached(body: bytes) -> bytes:
+    """Cache hit: only the per-user progress field is added."""
+    return json_array_with_field([(body, 50.0)], "progress")
+
+def outline(course: Course) -> bytes:
+    """Current path on a cache miss: outline without lesson content."""
+    tree = outline_adapter.dump_json(outline_adapter.validate_python(course, from_attributes=True))
+    return json_array_with_field([(tree, 50.0)], "progress")
+
+def run() -> None:
+    print(
+        f"{'size (mod x les x KB)':<24}{'payload':>10}{'legacy':>12}{'one pass':>12}{'cached':>12}"
+        f"{'outline':>12}{'outline size':>14}"
+    )
+    for n_modules, n_lessons, content_kb in SIZES:
+        course = build_course(n_modules, n_lessons, content_kb)
+        body = course_adapter.dump_json(course_adapter.validate_python(course, from_attributes=True))
+        assert json.loads(legacy(course)) == json.loads(single_pass(course)) == json.loads(cached(body))
+
+        timings = [
+            min(timeit.repeat(fn, number=REPEAT, repeat=3)) / REPEAT * 1000
+            for fn in (
+                lambda: legacy(course), lambda: single_pass(course), lambda: cached(body), lambda: outline(course)
+            )
+        ]
+        label = f"{n_modules} x {n_lessons} x {content_kb}"
+        print(
+            f"{label:<24}{len(body) / 1024:>8.0f}KB" + "".join(f"{ms:>10.2f}ms" for ms in timings)
+            + f"{len(outline(course)) / 1024:>12.1f}KB"
+        )
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,22 @@
+import asyncio
+import sys
+import os
+
+# Add parent directory to path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import AsyncSessionLocal
+from app.crud.crud_progress import course_progress
+
+async def rebuild():
+    """
+    Rebuild the user_course_progress counters from enrollments and user_progress.
+    Safe to run at any time; the table is replaced in a single transaction.
+    """
+    print("🔄 Rebuilding user_course_progress...")
+    async with AsyncSessionLocal() as db:
+        rows = await course_progress.rebuild(db)
+    print(f"✅ Rebuilt {rows} course progress rows.")
+
+if __name__ == "__main__":
+    asyncio.run(rebuild())
@@ -0,0 +1,74 @@
+import os
+import tempfile
+
+# Settings are read at import time; point the app at a throwaway SQLite file
+os.environ.setdefault("SUPABASE_URL", f"sqlite+aiosqlite:///{tempfile.gettempdir()}/edugenius-tests.db")
+os.environ.setdefault("DB_ECHO", "false")
+os.environ.setdefault("AUTH_VERIFIER", "firebase")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import httpx
+import pytest
+from fastapi import Request
+
+from app import schemas
+from app.core import security
+from app.crud import crud_course, user as crud_user
+from app.db.base import Base
+from app.db.session import AsyncSessionLocal, engine
+from app.main import app
+from app.services.course_cache import course_cache
+from app.services.progress_buffer import progress_buffer
+
+async def fake_current_user(request: Request) -> dict:
+    """`Authorization: Bearer <uid>` authenticates as <uid> (default "student")."""
+    uid = request.headers.get("authorization", "Bearer student").split()[-1]
+    return {"uid": uid, "email": f"{uid}@example.com", "name": uid}
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+async def db_schema(anyio_backend):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    course_cache.local.clear()
+    course_cache.lesson_contexts.clear()
+    progress_buffer._pending.clear()
+    yield
+    await engine.dispose()
+
+@pytest.fixture
+async def client(db_schema):
+    app.dependency_overrides[security.get_current_user] = fake_current_user
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test/api/v1") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+@pytest.fixture
+async def courses(db_schema):
+    """Three courses of 3 modules x 4 lessons each, owned by "instructor"; "student" exists too. Returns the course ids."""
+    async with AsyncSessionLocal() as db:
+        for uid in ("instructor", "student"):
+            await crud_user.ensure(db, obj_in=schemas.UserCreate(id=uid, email=f"{uid}@example.com"))
+        ids = []
+        for c in range(3):
+            course = await crud_course.course.create(
+                db, obj_in=schemas.CourseCreate(title=f"Course {c}"), instructor_id="instructor"
+            )
+            for m in range(3):
+                module = await crud_course.module.create(
+                    db, obj_in=schemas.ModuleCreate(title=f"Module {m}", order=m), course_id=course.id
+                )
+                for l in range(4):
+                    await crud_course.lesson.create(
+                        db,
+                        obj_in=schemas.LessonCreate(title=f"Lesson {m}.{l}", content="text " * 100, order=l),
+                        module_id=module.id,
+                    )
+            ids.append(course.id)
+    return ids
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from sqlalchemy import update
+
+from app.db.session import AsyncSessionLocal
+from app.models.course import Course
+from app.services.ai import ingestion
+from app.services.ai.registry import get_ai_registry
+from app.services.ai.semantic_cache import SemanticAnswerCache, semantic_cache
+from app.main import app
+
+pytestmark = pytest.mark.anyio
+
+def embed(text: str) -> list:
+    """Bag-of-words vector: rephrasings with the same words are near-identical."""
+    vector = np.zeros(64)
+    for word in text.lower().replace("?", "").split():
+        vector[sum(map(ord, word)) % 64] += 1
+    return vector.tolist()
+
+class StubProvider:
+    def __init__(self, calls: list):
+        self.calls = calls
+
+    async def generate_text(self, prompt, system_prompt=None, **kwargs):
+        self.calls.append("generate")
+        return f"answer {len(self.calls)}"
+
+    async def generate_json(self, prompt, schema, system_prompt=None, **kwargs):
+        return {}
+
+    async def get_embeddings(self, text, **kwargs):
+        return [embed(t) for t in ([text] if isinstance(text, str) else text)]
+
+class StubRegistry:
+    def __init__(self):
+        self.calls = []
+
+    def get(self, provider: str, model: str) -> StubProvider:
+        return StubProvider(self.calls)
+
+@pytest.fixture
+async def tutor(client, courses, monkeypatch):
+    async def no_matches(**kwargs):
+        return {"matches": []}
+
+    monkeypatch.setattr(ingestion.pinecone_service, "query_vectors", no_matches)
+    semantic_cache._courses.clear()
+    registry = StubRegistry()
+    app.dependency_overrides[get_ai_registry] = lambda: registry
+
+    async def ask(message, history=None):
+        response = await client.post(
+            "/ai/chat", json={"course_id": courses[0], "message": message, "history": history or []}
+        )
+        assert response.status_code == 200
+        return response.json()["response"]
+
+    ask.calls = registry.calls
+    return ask
+
+def test_lookup_threshold():
+    cache = SemanticAnswerCache(threshold=0.9, max_entries=10, max_courses=10, ttl=60)
+    cache.add(1, 1, [1.0, 0.0], "cached")
+
+    assert cache.lookup(1, 1, [0.99, 0.05]) == "cached"
+    assert cache.lookup(1, 1, [0.5, 0.5]) is None
+    assert cache.lookup(2, 1, [1.0, 0.0]) is None
+
+def test_version_bump_drops_answers():
+    cache = SemanticAnswerCache(threshold=0.9, max_entries=10, max_courses=10, ttl=60)
+    cache.add(1, 1, [1.0, 0.0], "old content")
+
+    assert cache.lookup(1, 2, [1.0, 0.0]) is None
+    assert cache.lookup(1, 1, [1.0, 0.0]) is None # dropped, not kept alongside
+    assert cache.stats()["invalidations"] == 1
+
+async def test_rephrased_question_is_answered_from_cache(tutor):
+    first = await tutor("what is a python list comprehension")
+    assert await tutor("What is a Python list comprehension?") == first
+    assert tutor.calls == ["generate"]
+
+async def test_course_edit_invalidates_answers(tutor, courses):
+    first = await tutor("what is a python list comprehension")
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(Course).where(Course.id == courses[0]).values(version=Course.version + 1))
+        await db.commit()
+
+    assert await tutor("what is a python list comprehension") != first
+    assert tutor.calls == ["generate", "generate"]
+
+async def test_follow_up_turns_bypass_the_cache(tutor):
+    await tutor("what is a python list comprehension")
+    history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+
+    await tutor("what is a python list comprehension", history)
+    assert tutor.calls == ["generate", "generate"]
+    assert semantic_cache.stats()["entries"] == 1
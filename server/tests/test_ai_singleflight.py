@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from app.services.ai.singleflight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    started = 0
+    release = asyncio.Event()
+
+    async def work():
+        nonlocal started
+        started += 1
+        await release.wait()
+        return "quiz"
+
+    waiters = [asyncio.ensure_future(flight.do("lesson-1", work)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*waiters) == ["quiz"] * 5
+    assert started == 1
+    assert flight.stats()["deduplicated"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+async def test_cancelling_one_waiter_keeps_the_shared_call():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    finished = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        finished.set()
+        return "answer"
+
+    first = asyncio.ensure_future(flight.do("key", work))
+    second = asyncio.ensure_future(flight.do("key", work))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    release.set()
+    assert await second == "answer"
+    assert finished.is_set()
+
+async def test_call_finishes_after_every_waiter_left():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    finished = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        finished.set()
+
+    waiter = asyncio.ensure_future(flight.do("key", work))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    release.set()
+    await asyncio.wait_for(finished.wait(), timeout=1)
+
+async def test_errors_reach_every_waiter_and_are_not_kept():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0)
+        raise RuntimeError("provider down")
+
+    results = await asyncio.gather(flight.do("key", work), flight.do("key", work), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from app import schemas
+from app.crud import user as crud_user
+from app.db.session import AsyncSessionLocal
+from app.services.enrollment_import import MAX_LINE_LENGTH
+
+pytestmark = pytest.mark.anyio
+
+INSTRUCTOR = {"Authorization": "Bearer instructor"}
+
+@pytest.fixture
+async def cohort(courses):
+    async with AsyncSessionLocal() as db:
+        for uid in ("alice", "bob"):
+            await crud_user.ensure(db, obj_in=schemas.UserCreate(id=uid, email=f"{uid}@example.com"))
+    return courses
+
+async def bulk(client, course_id, body, content_type):
+    return await client.post(
+        "/enrollments/bulk",
+        params={"course_id": course_id},
+        content=body.encode("utf-8"),
+        headers={**INSTRUCTOR, "Content-Type": content_type},
+    )
+
+async def test_bulk_csv(client, cohort):
+    await client.post(f"/enrollments/{cohort[0]}/enroll")
+    body = "user_id,email\nstudent,\nalice,\n,bob@example.com\nghost,\n,\nalice,\n"
+
+    response = await bulk(client, cohort[0], body, "text/csv")
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["created"], result["existing"], result["invalid"]) == (2, 2, 2)
+    assert "ghost" in result["invalid_samples"]
+
+async def test_bulk_ndjson(client, cohort):
+    lines = [
+        json.dumps({"user_id": "alice"}),
+        json.dumps("bob@example.com"),
+        json.dumps({"email": "nobody@example.com"}),
+        "{not json",
+        json.dumps({"id": "student"}),
+    ]
+
+    response = await bulk(client, cohort[1], "\n".join(lines), "application/x-ndjson")
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["created"], result["existing"], result["invalid"]) == (3, 0, 2)
+
+    enrolled = (await client.get("/enrollments/my-courses", headers={"Authorization": "Bearer bob"})).json()
+    assert [course["id"] for course in enrolled] == [cohort[1]]
+
+async def test_bulk_rejects_overlong_lines(client, cohort):
+    response = await bulk(client, cohort[0], "user_id\n" + "x" * (MAX_LINE_LENGTH * 2), "text/csv")
+    assert response.status_code == 400
+
+async def test_bulk_rejects_other_users_and_formats(client, cohort):
+    response = await client.post(
+        "/enrollments/bulk", params={"course_id": cohort[0]}, content=b"alice", headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 403
+
+    response = await bulk(client, cohort[0], "alice", "application/json")
+    assert response.status_code == 415
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from app.services.progress_buffer import progress_buffer
+
+pytestmark = pytest.mark.anyio
+
+async def test_player_heartbeat_is_buffered_then_flushed(client, courses):
+    await client.post("/progress/1", json={"is_completed": True})
+
+    # What the video player sends every 15 seconds below its completion threshold
+    response = await client.post("/progress/1", json={"video_progress": 45, "is_completed": False})
+    assert response.status_code == 202
+    assert response.json() == {"user_id": "student", "lesson_id": 1, "video_progress": 45.0}
+    assert progress_buffer.stats()["depth"] == 1
+    assert (await client.get("/progress/1")).json()["video_progress"] == 45.0
+
+    assert await progress_buffer.flush() == 1
+    assert progress_buffer.stats()["depth"] == 0
+    row = (await client.get("/progress/1")).json()
+    assert row["video_progress"] == 45.0
+    assert row["is_completed"] is True # a heartbeat never clears a completion
+
+async def test_completion_is_written_synchronously(client, courses):
+    response = await client.post("/progress/2", json={"video_progress": 95, "is_completed": True})
+    assert response.status_code == 200
+    assert response.json()["is_completed"] is True
+    assert progress_buffer.stats()["depth"] == 0
+
+async def test_concurrent_completions_count_once(client, courses):
+    await client.post(f"/enrollments/{courses[0]}/enroll")
+    responses = await asyncio.gather(*[client.post("/progress/1", json={"is_completed": True}) for _ in range(5)])
+    assert [response.status_code for response in responses] == [200] * 5
+
+    [course] = (await client.get("/enrollments/my-courses")).json()
+    assert course["progress"] == pytest.approx(100 / 12)
+
+async def test_batch_older_timestamp_loses(client, courses):
+    await client.post(f"/enrollments/{courses[0]}/enroll")
+    await client.post("/progress/batch", json=[
+        {"lesson_id": 1, "is_completed": True, "client_timestamp": "2030-01-01T00:00:00Z"},
+    ])
+    response = await client.post("/progress/batch", json=[
+        {"lesson_id": 1, "is_completed": False, "client_timestamp": "2020-01-01T00:00:00Z"},
+    ])
+    assert response.status_code == 200
+    assert response.json()[0]["is_completed"] is True
+    assert (await client.get("/progress/1")).json()["is_completed"] is True
+    # The losing item didn't move the course counter either
+    [course] = (await client.get("/enrollments/my-courses")).json()
+    assert course["progress"] == pytest.approx(100 / 12)
+
+async def test_batch_merges_items_per_lesson_in_time_order(client, courses):
+    response = await client.post("/progress/batch", json=[
+        {"lesson_id": 2, "video_progress": 80, "client_timestamp": "2024-01-01T00:00:02Z"},
+        {"lesson_id": 2, "video_progress": 20, "is_completed": True, "client_timestamp": "2024-01-01T00:00:01Z"},
+    ])
+    [row] = response.json()
+    assert (row["video_progress"], row["is_completed"]) == (80.0, True)
+
+async def test_batch_skips_unknown_lessons(client, courses):
+    response = await client.post("/progress/batch", json=[
+        {"lesson_id": 1, "is_completed": True},
+        {"lesson_id": 9999, "is_completed": True},
+    ])
+    assert response.status_code == 200
+    assert [row["lesson_id"] for row in response.json()] == [1]
+
+    response = await client.post("/progress/batch", json=[{"lesson_id": 9999, "is_completed": True}])
+    assert response.json() == []
@@ -0,0 +1,74 @@
+"""
+Query budgets for endpoints that were reduced to a fixed number of statements.
+A regression such as a lazy load per lesson fails here instead of showing up
+as a slow endpoint in production.
+"""
+import pytest
+
+from app.db.instrumentation import assert_max_queries, assert_response_queries
+
+pytestmark = pytest.mark.anyio
+
+async def test_my_courses(client, courses):
+    for course_id in courses:
+        await client.post(f"/enrollments/{course_id}/enroll")
+
+    # Versions + progress, then one tree query with two selectin loads for the cache misses
+    with assert_max_queries(4):
+        response = await client.get("/enrollments/my-courses")
+    assert response.status_code == 200
+    assert len(response.json()) == len(courses)
+
+    # Trees cached: only the versions query
+    response = await client.get("/enrollments/my-courses")
+    assert_response_queries(response, 1)
+
+async def test_progress_update(client, courses):
+    # Completing: the upsert, the flag flip, then the course counter
+    response = await client.post("/progress/1", json={"video_progress": 95, "is_completed": True})
+    assert_response_queries(response, 3)
+    assert response.json()["is_completed"] is True
+
+    # Flag unchanged: the upsert alone
+    response = await client.post("/progress/1", json={"video_progress": 99, "is_completed": True})
+    assert_response_queries(response, 1)
+
+async def test_progress_batch(client, courses):
+    # Every lesson of the first two courses, one counter update per course
+    items = [{"lesson_id": lesson_id, "is_completed": True} for lesson_id in range(1, 25)]
+
+    response = await client.post("/progress/batch", json=items)
+    assert_response_queries(response, 7)
+    assert response.status_code == 200
+    assert len(response.json()) == 24
+    assert all(row["is_completed"] for row in response.json())
+
+async def test_course_progress(client, courses):
+    await client.post("/progress/1", json={"is_completed": True})
+
+    response = await client.get(f"/progress/course/{courses[0]}")
+    assert_response_queries(response, 1)
+    assert response.status_code == 200
+    assert len(response.json()) == 12
+
+async def test_course_outline(client, courses):
+    # Validators, then the tree with its modules and lessons
+    response = await client.get(f"/courses/{courses[0]}")
+    assert_response_queries(response, 4)
+    assert response.status_code == 200
+    lessons = [lesson for module in response.json()["modules"] for lesson in module["lessons"]]
+    assert len(lessons) == 12
+    assert all("content" not in lesson for lesson in lessons)
+
+    response = await client.get(f"/courses/{courses[0]}")
+    assert_response_queries(response, 1)
+
+    response = await client.get(f"/courses/{courses[0]}", headers={"If-None-Match": response.headers["etag"]})
+    assert_response_queries(response, 1)
+    assert response.status_code == 304
+
+async def test_lesson(client, courses):
+    response = await client.get("/courses/lessons/1")
+    assert_response_queries(response, 1)
+    assert response.status_code == 200
+    assert response.json()["content"]
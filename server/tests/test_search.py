@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import text
+
+from app import schemas
+from app.crud import crud_course, user as crud_user
+from app.db.session import AsyncSessionLocal, engine
+from app.services.search.factory import setup_search
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def catalog(db_schema):
+    # drop_all doesn't know the FTS5 table; rebuild it so its triggers see the new tables
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS search_index"))
+    await setup_search(engine)
+
+    async with AsyncSessionLocal() as db:
+        await crud_user.ensure(db, obj_in=schemas.UserCreate(id="instructor", email="instructor@example.com"))
+        published = await crud_course.course.create(
+            db,
+            obj_in=schemas.CourseCreate(title="Python decorators", description="Wrapping functions", is_published=True),
+            instructor_id="instructor",
+        )
+        module = await crud_course.module.create(
+            db, obj_in=schemas.ModuleCreate(title="Basics", order=0), course_id=published.id
+        )
+        for i in range(3):
+            await crud_course.lesson.create(
+                db,
+                obj_in=schemas.LessonCreate(
+                    title=f"Lesson {i}", content=f"Part {i} shows how a decorator wraps a function.", order=i
+                ),
+                module_id=module.id,
+            )
+        await crud_course.course.create(
+            db,
+            obj_in=schemas.CourseCreate(title="Secret decorators draft", description="Unreleased"),
+            instructor_id="instructor",
+        )
+    return published.id
+
+async def test_ranks_title_matches_first_with_snippets(client, catalog):
+    published_id = catalog
+    page = (await client.get("/search/", params={"q": "decorators"})).json()
+
+    top = page["items"][0]
+    assert (top["kind"], top["id"]) == ("course", published_id)
+    assert [hit["rank"] for hit in page["items"]] == sorted((hit["rank"] for hit in page["items"]), reverse=True)
+    lesson_hits = [hit for hit in page["items"] if hit["kind"] == "lesson"]
+    assert len(lesson_hits) == 3
+    assert all("<mark>decorator</mark>" in hit["snippet"] for hit in lesson_hits)
+
+async def test_paginates(client, catalog):
+    first = (await client.get("/search/", params={"q": "decorator", "limit": 2})).json()
+    assert len(first["items"]) == 2
+    assert first["next_offset"] == 2
+
+    rest = (await client.get("/search/", params={"q": "decorator", "limit": 2, "offset": 2})).json()
+    assert len(rest["items"]) == 2
+    assert rest["next_offset"] is None
+    seen = [(hit["kind"], hit["id"]) for hit in first["items"] + rest["items"]]
+    assert len(set(seen)) == 4
+
+async def test_never_returns_unpublished_courses(client, catalog):
+    for params in ({"q": "secret"}, {"q": "secret", "published_only": "false"}):
+        page = (await client.get("/search/", params=params)).json()
+        assert page["items"] == []
@@ -0,0 +1,111 @@
+import asyncio
+import datetime
+import json
+import time
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from jose import jwt
+
+from app.core import security
+from app.core.security import FileKeySource, PublicKeyVerifier, UnknownSigningKeyError
+
+pytestmark = pytest.mark.anyio
+
+PROJECT_ID = "edugenius-test"
+
+def make_key_pair():
+    """RSA private key (PEM) and a self-signed certificate (PEM), as Google publishes them."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    return private_pem, certificate.public_bytes(serialization.Encoding.PEM).decode()
+
+@pytest.fixture(scope="module")
+def signing_keys():
+    return {"key-1": make_key_pair(), "key-2": make_key_pair()}
+
+@pytest.fixture
+def keys_file(tmp_path, signing_keys):
+    path = tmp_path / "keys.json"
+    path.write_text(json.dumps({"key-1": signing_keys["key-1"][1]}))
+    return path
+
+@pytest.fixture
+async def verifier(anyio_backend, keys_file):
+    verifier = PublicKeyVerifier(FileKeySource(str(keys_file)), project_id=PROJECT_ID, min_refresh_seconds=0)
+    await verifier.start()
+    yield verifier
+    await verifier.stop()
+
+def make_token(signing_keys, kid="key-1", **overrides):
+    now = int(time.time())
+    claims = {
+        "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+        "aud": PROJECT_ID,
+        "sub": "user-1",
+        "iat": now - 10,
+        "auth_time": now - 10,
+        "exp": now + 3600,
+        **overrides,
+    }
+    claims = {name: value for name, value in claims.items() if value is not None}
+    return jwt.encode(claims, signing_keys[kid][0], algorithm="RS256", headers={"kid": kid})
+
+async def test_accepts_valid_token(verifier, signing_keys):
+    claims = verifier.verify(make_token(signing_keys))
+    assert claims["uid"] == "user-1"
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"aud": "another-project"},
+        {"iss": "https://securetoken.google.com/another-project"},
+        {"exp": int(time.time()) - 60},
+        {"iat": int(time.time()) + 600},
+        {"iat": None},
+        {"auth_time": int(time.time()) + 600},
+        {"sub": ""},
+    ],
+)
+async def test_rejects_invalid_claims(verifier, signing_keys, overrides):
+    with pytest.raises(jwt.JWTError):
+        verifier.verify(make_token(signing_keys, **overrides))
+
+async def test_clock_skew_tolerates_small_iat_drift(keys_file, signing_keys):
+    verifier = PublicKeyVerifier(FileKeySource(str(keys_file)), project_id=PROJECT_ID, clock_skew_seconds=60)
+    await verifier.refresh()
+    verifier.verify(make_token(signing_keys, iat=int(time.time()) + 30))
+    with pytest.raises(jwt.JWTError):
+        verifier.verify(make_token(signing_keys, iat=int(time.time()) + 600))
+
+async def test_unknown_kid_triggers_refresh(verifier, signing_keys, keys_file, monkeypatch):
+    monkeypatch.setattr(security, "token_verifier", verifier)
+    token = make_token(signing_keys, kid="key-2")
+
+    # Google rotated keys: the token is signed with a key this worker hasn't loaded yet
+    keys_file.write_text(json.dumps({kid: pair[1] for kid, pair in signing_keys.items()}))
+    with pytest.raises(UnknownSigningKeyError):
+        await security.verify_token(token)
+
+    for _ in range(100):
+        if "key-2" in verifier._keys:
+            break
+        await asyncio.sleep(0.01)
+    assert (await security.verify_token(token))["uid"] == "user-1"